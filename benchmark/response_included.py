@@ -0,0 +1,94 @@
+"""
+python benchmark/response_included.py \
+    --depth 10000 \
+    --records 10000
+"""
+
+import argparse
+import timeit
+from pio.model.response import APIResponse
+
+
+def identifier(resource_type: str, resource_id: int) -> dict:
+    return {"data": {"type": resource_type, "id": str(resource_id)}}
+
+
+def deep_chain(depth: int) -> tuple[list, list]:
+    """
+    A single line item whose included resources form a chain `depth` long
+    """
+    data = [
+        {
+            "type": "line_items",
+            "id": "root",
+            "relationships": {"next": identifier("line_items", 0)},
+        }
+    ]
+    included = [
+        {
+            "type": "line_items",
+            "id": str(index),
+            "attributes": {"name": f"Line Item {index}"},
+            "relationships": {"next": identifier("line_items", index + 1)},
+        }
+        for index in range(depth)
+    ]
+    return data, included
+
+
+def shared_includes(records: int) -> tuple[list, list]:
+    """
+    Line items which all reference the same campaign, opportunity and account,
+    with a cycle between the campaign and opportunity
+    """
+    data = [
+        {
+            "type": "line_items",
+            "id": str(index),
+            "relationships": {"campaign": identifier("campaigns", 1)},
+        }
+        for index in range(records)
+    ]
+    included = [
+        {
+            "type": "campaigns",
+            "id": "1",
+            "relationships": {
+                "opportunity": identifier("opportunities", 1),
+                "advertiser": identifier("accounts", 1),
+            },
+        },
+        {
+            "type": "opportunities",
+            "id": "1",
+            "relationships": {"campaign": identifier("campaigns", 1)},
+        },
+        {"type": "accounts", "id": "1", "attributes": {"name": "Advertiser"}},
+    ]
+    return data, included
+
+
+def benchmark(name: str, build, size: int, number: int, lazy: bool = False):
+    # Responses are built from fresh payloads as primary records are modified
+    payloads = [build(size) for _ in range(number)]
+    seconds = (
+        timeit.timeit(lambda: APIResponse(*payloads.pop(), lazy=lazy), number=number)
+        / number
+    )
+    mode = "lazy" if lazy else "eager"
+    print(f"{name:<16} {mode:<6} size={size:<8} {seconds * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark merging included resources in APIResponse."
+    )
+    parser.add_argument("--depth", type=int, default=10000)
+    parser.add_argument("--records", type=int, default=10000)
+    parser.add_argument("--number", type=int, default=5)
+    args = parser.parse_args()
+    for lazy in [False, True]:
+        for size in [args.depth // 10, args.depth]:
+            benchmark("deep chain", deep_chain, size, args.number, lazy)
+        for size in [args.records // 10, args.records]:
+            benchmark("shared includes", shared_includes, size, args.number, lazy)
@@ -22,10 +22,10 @@ async def set_opportunity_line_item_name_from_custom_field(
     custom_field_name: str,
 ):
     pio = PlacementsIO(environment=environment, token=token)
+    olis = await pio.opportunity_line_items.get_many(opportunity_line_items)
 
     async def set_custom_field_as_oli_name(resource_id):
-        oli_list = await pio.opportunity_line_items.get(id=resource_id)
-        oli = oli_list[0]
+        oli = olis.get(resource_id, {})
         oli_attributes = oli.get("attributes", {})
         oli_custom_fields = oli_attributes.get("custom-fields") or {}
         oli_custom_field_value = oli_custom_fields.get(custom_field_name)
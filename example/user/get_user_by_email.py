@@ -16,7 +16,7 @@ logging.getLogger("pio").setLevel(logging.DEBUG)
 
 async def get_user_by_email(environment: str, token: str, email: int):
     pio = PlacementsIO(environment=environment, token=token)
-    result = await pio.users.get(email=email)
+    result = await pio.users.first(email=email)
     print(json.dumps(result, indent=4, default=str))
 
 
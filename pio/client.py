@@ -6,12 +6,50 @@ Low level code to interact with the Placements.io Python SDK
 import logging
 import asyncio
 import json
-from typing import Union
+import math
+from urllib.parse import quote
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, Iterator, Union
 import httpx
 from pio.error.api_error import APIError
+from pio.utility.connection import ConnectionPool, DEFAULT_TIMEOUT
+from pio.utility.rate_limiter import RateLimiter
+from pio.utility.concurrency import (
+    gather_limited,
+    iterate_limited,
+    call_blocking,
+    DEFAULT_MAX_CONCURRENCY,
+    DEFAULT_WRITE_CONCURRENCY,
+)
 from pio.utility.json_encoder import JSONEncoder
+from pio.utility.json_codec import JSONCodec, default_codec
+from pio.utility.worker_pool import WorkerPool
+from pio.utility.page_size import PageSizeTuner, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from pio.utility.cache import Cache
+from pio.utility.entity_store import EntityStore
+from pio.utility.single_flight import SingleFlight
 from pio.model.response import APIResponse
 
+MAX_URL_LENGTH = 2048
+CREATE_MAX_RETRIES = 3
+CREATE_RETRY_DELAY = 1
+# Responses which the API returns before processing a request
+UNPROCESSED_STATUS_CODES = {503}
+# Errors raised before a request is sent to the API
+UNSENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+def decode_page(codec: JSONCodec, content: bytes) -> dict:
+    """
+    Decodes a page of results, raising any errors returned by the API
+    Note: This is a module level function so that it can be run by process workers
+    """
+    data = codec.loads(content)
+    errors = data.get("errors", [])
+    if errors:
+        raise APIError(errors)
+    return data
+
 
 class PlacementsIOClient:
     """
@@ -19,10 +57,40 @@ class PlacementsIOClient:
     Low level code to interact with the Placements.io API
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        connection: ConnectionPool = None,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        write_concurrency: int = DEFAULT_WRITE_CONCURRENCY,
+        rate_limiter: RateLimiter = None,
+        max_url_length: int = MAX_URL_LENGTH,
+        codec: JSONCodec = None,
+        worker_pool: WorkerPool = None,
+        page_size: Union[int, str] = DEFAULT_PAGE_SIZE,
+        page_sizes: dict = None,
+        max_page_size: int = MAX_PAGE_SIZE,
+        page_tuner: PageSizeTuner = None,
+        cache: Cache = None,
+        entity_store: EntityStore = None,
+        single_flight: SingleFlight = None,
+    ):
         self.logger = logging.getLogger("pio")
         self.base_url = None
         self.token = None
+        self.connection = connection
+        self.max_concurrency = max_concurrency
+        self.write_concurrency = write_concurrency
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.max_url_length = max_url_length
+        self.codec = codec or default_codec()
+        self.worker_pool = worker_pool or WorkerPool()
+        self.page_size = page_size
+        self.page_sizes = page_sizes or {}
+        self.max_page_size = max_page_size
+        self.page_tuner = page_tuner or PageSizeTuner(max_size=max_page_size)
+        self.cache = cache
+        self.entity_store = entity_store
+        self.single_flight = single_flight or SingleFlight()
 
     @property
     def _version(self):
@@ -34,24 +102,80 @@ class PlacementsIOClient:
 
         return __version__
 
-    def pagination(self, page_number: int = 1) -> dict:
+    @asynccontextmanager
+    async def session(self):
+        """
+        Yields the shared pooled client when one is available, otherwise a
+        short-lived client which is closed when the context exits.
+        """
+        if self.connection is not None:
+            yield self.connection.client
+            return
+        async with httpx.AsyncClient(
+            base_url=self.base_url, timeout=DEFAULT_TIMEOUT
+        ) as client:
+            yield client
+
+    def pagination(
+        self, page_number: int = 1, page_size: int = DEFAULT_PAGE_SIZE
+    ) -> dict:
         """
         Provides pagination parameters for the API request.
         """
         return {
             "page[number]": page_number,
-            "page[size]": 100,
+            "page[size]": page_size,
         }
 
+    def _page_size(self, service: str, page_size: Union[int, str] = None) -> int:
+        """
+        Resolves the page size for a request from the call, the service or the
+        instance, in that order, capped at the maximum page size
+        Note: A page size of "auto" uses the size chosen by the page size tuner
+        """
+        if self._auto_page_size(service, page_size):
+            page_size = self.page_tuner.size(service)
+        else:
+            page_size = page_size or self.page_sizes.get(service, self.page_size)
+        return max(1, min(int(page_size), self.max_page_size))
+
+    def _auto_page_size(self, service: str, page_size: Union[int, str] = None) -> bool:
+        """
+        Returns whether the page size for a request is chosen by the page size
+        tuner, so that only those requests record their pages with the tuner
+        """
+        return (page_size or self.page_sizes.get(service, self.page_size)) == "auto"
+
+    def _observe_page(
+        self, service: str, param: dict, response: httpx.Response, data: dict
+    ):
+        """
+        Records the latency and payload size of a page with the page size tuner
+        """
+        if response.extensions.get("cached"):
+            return
+        self.page_tuner.observe(
+            service,
+            param["page[size]"],
+            len(data.get("data", [])),
+            response.elapsed.total_seconds(),
+            len(response.content),
+        )
+
+    def _token(self) -> str:
+        """
+        Returns the token, refreshing it when the token is provided by a callable
+        """
+        if callable(self.token):
+            return self.token()
+        return self.token
+
     def headers(self, method, service, is_retry) -> dict:
         """
         Returns standardized headers for the API request.
         """
-        token = self.token
-        if callable(self.token):
-            token = self.token()
         return {
-            "Authorization": f"Bearer {token}",
+            "Authorization": f"Bearer {self._token()}",
             "Content-Type": "application/vnd.api+json",
             "User-Agent": f"PlacementsIO Python SDK/{self._version}",
             "x-metadata": json.dumps(
@@ -74,23 +198,30 @@ class PlacementsIOClient:
         client_method = getattr(client, method)
         request = {
             "url": resource,
-            "headers": self.headers(method, resource, is_retry),
             **request,
+            "headers": {
+                **self.headers(method, resource, is_retry),
+                **request.get("headers", {}),
+            },
         }
-        if request.get("data") and not isinstance(request["data"], str):
-            request["data"] = json.dumps(request["data"], default=str, cls=JSONEncoder)
-        response = await client_method(**request)
-        if response.status_code == 429:
+        if request.get("data") and not isinstance(request["data"], (str, bytes)):
+            request["data"] = self.codec.dumps(request["data"])
+        while True:
+            await self.rate_limiter.acquire()
+            try:
+                response = await client_method(**request)
+            finally:
+                self.rate_limiter.release()
+            if response.status_code != 429:
+                self.rate_limiter.record_success()
+                return response
             retry_after = int(response.headers.get("Retry-After", 60))
             self.logger.warning(
                 "Rate limit reached. Waiting %s seconds before retrying...",
                 retry_after,
             )
-            await asyncio.sleep(retry_after)
-            return await self.client_request(
-                client, method, resource, request, is_retry=True
-            )
-        return response
+            self.rate_limiter.record_throttle(retry_after)
+            request["headers"].update(self.headers(method, resource, is_retry=True))
 
     async def client(
         self,
@@ -99,52 +230,369 @@ class PlacementsIOClient:
         filters: dict = None,
         includes: list = None,
         fields: list = None,
+        max_concurrency: int = None,
+        lazy: bool = False,
+        page_size: Union[int, str] = None,
+        limit: int = None,
     ) -> APIResponse:
         """
         Get existing resources within the service
+        Note: At most `max_concurrency` pages are requested at the same time,
+        defaulting to the limit set on the instance. When `lazy` is set included
+        resources are merged into relationships when they are first accessed.
+        When `limit` is set at most `limit` resources are returned, the page size
+        is reduced to match and only the pages needed are requested. A `limit` of
+        0 returns no resources without making a request.
         """
-        # TODO: Need to have a way to call multiple IDs at the same time
-        async with httpx.AsyncClient(base_url=self.base_url, timeout=60) as client:
-
-            param = param or {}
-            param.update(self.pagination())
-            param.update(self._filter_values(filters))
-            param.update(self._list_values("include", includes))
-            fields = self._merge_includes_into_fields(service, includes, fields)
-            param.update(self._fields_values(service, fields))
-            self.logger.info("Fetching data from %s", service)
-            response = await self.client_request(
-                client, "get", service, {"params": param}
+        if limit is not None and limit < 0:
+            raise ValueError("Limit must not be negative.")
+        if limit == 0:
+            return APIResponse(data=[])
+        if limit is not None:
+            page_size = min(limit, self._page_size(service, page_size))
+        observe = self._auto_page_size(service, page_size)
+        async with self.session() as client:
+            param = self._get_params(
+                service, param, filters, includes, fields, page_size
             )
-            data = response.json()
-            errors = data.get("errors", [])
-            if errors:
-                raise APIError(errors)
+            data = await self._first_page(client, service, param, observe)
             results = data.get("data", [])
-            included = data.get("included", [])
             meta = data.get("meta", {})
+            # Included resources are de-duplicated by (type, id) as each page
+            # arrives as the same resource is often included on many pages
+            included = {}
+            duplicates = self._add_included(included, data)
             page_count = meta.get("page-count", 0)
-            if page_count > 1:
-                self.logger.info(
-                    "Paginating data from %s [%s Pages]", service, page_count
+            if limit is not None:
+                page_count = min(page_count, math.ceil(limit / param["page[size]"]))
+
+            async def fetch_page(request: Awaitable[httpx.Response]) -> list:
+                nonlocal duplicates
+                response = await request
+                page_data = await self._decode_page(response)
+                if observe:
+                    self._observe_page(service, param, response, page_data)
+                duplicates += self._add_included(included, page_data)
+                return page_data.get("data", [])
+
+            pages = await gather_limited(
+                (
+                    fetch_page(request)
+                    for request in self._page_requests(
+                        client, service, param, page_count
+                    )
+                ),
+                max_concurrency or self.max_concurrency,
+            )
+            for page in pages:
+                results.extend(page)
+            if limit is not None:
+                del results[limit:]
+
+            if included:
+                meta = {**meta, "included-duplicates": duplicates}
+            return await self._response(results, list(included.values()), meta, lazy)
+
+    async def client_many(
+        self,
+        service: str,
+        resource_ids: list,
+        param: dict = None,
+        filters: dict = None,
+        includes: list = None,
+        fields: list = None,
+        max_concurrency: int = None,
+        lazy: bool = False,
+        page_size: Union[int, str] = None,
+    ) -> dict:
+        """
+        Get existing resources within the service for many IDs at the same time
+        Note: IDs are requested in batches using comma separated ID filters which
+        are split to fit within a single page and the maximum URL length
+        """
+        ids = {str(resource_id): resource_id for resource_id in resource_ids}
+        base_param = self._get_params(
+            service, param, filters, includes, fields, page_size
+        )
+        batches = self._id_batches(service, list(ids), base_param)
+        if len(batches) > 1:
+            self.logger.info(
+                "Fetching %s IDs from %s [%s Batches]", len(ids), service, len(batches)
+            )
+        responses = await gather_limited(
+            (
+                self.client(
+                    service=service,
+                    param=param,
+                    filters={**(filters or {}), "id": ",".join(batch)},
+                    includes=includes,
+                    fields=fields,
+                    max_concurrency=max_concurrency,
+                    lazy=lazy,
+                    page_size=base_param["page[size]"],
                 )
+                for batch in batches
+            ),
+            max_concurrency or self.max_concurrency,
+        )
+        results = {}
+        for response in responses:
+            for resource in response:
+                resource_id = str(resource.get("id"))
+                if resource_id in ids:
+                    results[ids[resource_id]] = resource
+        return results
+
+    def _id_batches(self, service: str, resource_ids: list, param: dict) -> list:
+        """
+        Splits IDs into batches which fit within a single page of results and
+        keep the request URL under the maximum URL length
+        """
+        url = httpx.URL(f"{self.base_url or ''}{service}", params=param)
+        # Allow for the "&filter[id]=" parameter once it has been URL encoded
+        base_length = len(str(url)) + len("&filter%5Bid%5D=")
+        batch_size = param.get("page[size]") or self._page_size(service)
+        batches = []
+        batch = []
+        length = base_length
+        for resource_id in resource_ids:
+            # Allow for the comma separator once it has been URL encoded
+            id_length = len(quote(resource_id)) + len("%2C")
+            if batch and (
+                len(batch) >= batch_size or length + id_length > self.max_url_length
+            ):
+                batches.append(batch)
+                batch = []
+                length = base_length
+            batch.append(resource_id)
+            length += id_length
+        if batch:
+            batches.append(batch)
+        return batches
+
+    async def client_pages(
+        self,
+        service: str,
+        param: dict = None,
+        filters: dict = None,
+        includes: list = None,
+        fields: list = None,
+        max_concurrency: int = None,
+        page_size: Union[int, str] = None,
+    ) -> AsyncIterator[dict]:
+        """
+        Yields each page of existing resources within the service, in order, as
+        soon as it has been downloaded
+        Note: At most `max_concurrency` pages are read ahead of the consumer,
+        defaulting to the limit set on the instance
+        """
+        observe = self._auto_page_size(service, page_size)
+        async with self.session() as client:
+            param = self._get_params(
+                service, param, filters, includes, fields, page_size
+            )
+            data = await self._first_page(client, service, param, observe)
+            yield data
+
+            pages = iterate_limited(
+                self._page_requests(
+                    client, service, param, data.get("meta", {}).get("page-count", 0)
+                ),
+                max_concurrency or self.max_concurrency,
+            )
+            async for response in pages:
+                page_data = await self._decode_page(response)
+                if observe:
+                    self._observe_page(service, param, response, page_data)
+                yield page_data
 
-            tasks = []
-            for page_number in range(2, page_count + 1):
-                paginated_param = param.copy()
-                paginated_param.update(self.pagination(page_number))
-                tasks.append(
-                    self.client_request(
-                        client, "get", service, {"params": paginated_param}
-                    )
+    def _get_params(
+        self,
+        service: str,
+        param: dict = None,
+        filters: dict = None,
+        includes: list = None,
+        fields: list = None,
+        page_size: Union[int, str] = None,
+    ) -> dict:
+        """
+        Builds the query parameters for the first page of a GET request
+        """
+        param = dict(param or {})
+        param.update(self.pagination(page_size=self._page_size(service, page_size)))
+        param.update(self._filter_values(filters))
+        param.update(self._list_values("include", includes))
+        fields = self._merge_includes_into_fields(service, includes, fields)
+        param.update(self._fields_values(service, fields))
+        return param
+
+    async def _first_page(
+        self,
+        client: httpx.AsyncClient,
+        service: str,
+        param: dict,
+        observe: bool = False,
+    ) -> dict:
+        """
+        Requests the first page of a GET request which provides the page count
+        Note: When `observe` is set the page is recorded with the page size tuner
+        """
+        self.logger.info("Fetching data from %s", service)
+        response = await self._get_page(client, service, param)
+        data = await self._decode_page(response)
+        if observe:
+            self._observe_page(service, param, response, data)
+        page_count = data.get("meta", {}).get("page-count", 0)
+        if page_count > 1:
+            self.logger.info("Paginating data from %s [%s Pages]", service, page_count)
+        return data
+
+    def _page_requests(
+        self, client: httpx.AsyncClient, service: str, param: dict, page_count: int
+    ) -> Iterator[Awaitable[httpx.Response]]:
+        """
+        Lazily creates the requests for pages 2 to `page_count` of a GET request
+        """
+        return (
+            self._get_page(client, service, {**param, "page[number]": page_number})
+            for page_number in range(2, page_count + 1)
+        )
+
+    async def _get_page(
+        self, client: httpx.AsyncClient, service: str, param: dict
+    ) -> httpx.Response:
+        """
+        Requests a page of a GET request, sharing the response of an identical
+        request which is already in flight
+        Note: The shared response is decoded by each caller, as building a
+        response modifies the decoded page
+        """
+        key = self.single_flight.key("get", service, param)
+        return await self.single_flight.run(
+            key, lambda: self._fetch_page(client, service, param)
+        )
+
+    async def _fetch_page(
+        self, client: httpx.AsyncClient, service: str, param: dict
+    ) -> httpx.Response:
+        """
+        Requests a page of a GET request, served from the response cache when
+        one is set and the page is cached
+        Note: Expired pages are revalidated with a conditional request using the
+        ETag and Last-Modified headers of the cached response, and served from
+        the cache when the API responds 304 Not Modified. When refreshing an
+        expired page fails with a transport error or a server error the expired
+        page is served if it is within the cache's `max_stale` period.
+        """
+        if self.cache is None:
+            return await self.client_request(client, "get", service, {"params": param})
+        key = self.cache.key(service, param, self.base_url, self._token())
+        content = await call_blocking(self.cache, "get", key)
+        if content is not None:
+            return self._cached_response(client, service, param, content)
+        request = {"params": param}
+        conditional_headers = await call_blocking(
+            self.cache, "conditional_headers", key
+        )
+        if conditional_headers:
+            request["headers"] = conditional_headers
+        try:
+            response = await self.client_request(client, "get", service, request)
+            if response.status_code == 304:
+                content = await call_blocking(self.cache, "revalidate", key)
+                if content is not None:
+                    return self._cached_response(client, service, param, content)
+                # The cached response was evicted while it was being revalidated
+                response = await self.client_request(
+                    client, "get", service, {"params": param}
                 )
-            responses = await asyncio.gather(*tasks)
-            for response in responses:
-                page_data = response.json()
-                results.extend(page_data.get("data", []))
-                included.extend(page_data.get("included", []))
+        except httpx.TransportError:
+            content = await call_blocking(self.cache, "get_stale", key)
+            if content is None:
+                raise
+            self.logger.warning("Serving stale data from %s", service)
+            return self._cached_response(client, service, param, content)
+        if response.status_code == 200:
+            await call_blocking(
+                self.cache,
+                "set",
+                key,
+                service,
+                response.content,
+                "include" in param,
+                {
+                    "etag": response.headers.get("ETag"),
+                    "last_modified": response.headers.get("Last-Modified"),
+                },
+            )
+        elif response.status_code >= 500:
+            content = await call_blocking(self.cache, "get_stale", key)
+            if content is not None:
+                self.logger.warning("Serving stale data from %s", service)
+                return self._cached_response(client, service, param, content)
+        return response
 
-            return APIResponse(data=results, included=included, meta=meta)
+    def _cached_response(
+        self, client: httpx.AsyncClient, service: str, param: dict, content: bytes
+    ) -> httpx.Response:
+        """
+        Builds a response for a page served from the response cache
+        """
+        return httpx.Response(
+            status_code=200,
+            content=content,
+            request=client.build_request("get", service, params=param),
+            extensions={"cached": True},
+        )
+
+    def _add_included(self, included: dict, page_data: dict) -> int:
+        """
+        Adds the included resources of a page to a dict keyed by (type, id) and
+        returns the number of resources which had already been included
+        """
+        duplicates = 0
+        for resource in page_data.get("included", []):
+            key = (resource.get("type"), resource.get("id"))
+            if key in included:
+                duplicates += 1
+            else:
+                included[key] = resource
+        return duplicates
+
+    def _page_data(self, response: httpx.Response) -> dict:
+        """
+        Decodes a page of results, raising any errors returned by the API
+        """
+        return decode_page(self.codec, response.content)
+
+    async def _decode_page(self, response: httpx.Response) -> dict:
+        """
+        Decodes a page of results in the worker pool, raising any errors returned
+        by the API
+        """
+        return await self.worker_pool.run(decode_page, self.codec, response.content)
+
+    async def _response(
+        self, data: list, included: list, meta: dict, lazy: bool = False
+    ) -> APIResponse:
+        """
+        Builds an APIResponse, merging included resources in the worker pool
+        Note: Lazy responses are built inline as they defer merging until each
+        relationship is accessed. When an entity store is set resources are
+        merged into the store and the response refers to the stored resources,
+        whose relationships are linked to the stored related resources.
+        """
+        if self.entity_store is not None:
+            entities = self.entity_store.merge_all([*data, *included])
+            data, included = entities[: len(data)], entities[len(data) :]
+            response = APIResponse(data=data, meta=meta)
+            response.included = included
+            return response
+        if lazy:
+            return APIResponse(data=data, included=included, meta=meta, lazy=True)
+        return await self.worker_pool.run(
+            APIResponse, data=data, included=included, meta=meta
+        )
 
     async def resource(
         self,
@@ -154,21 +602,42 @@ class PlacementsIOClient:
         """
         Get a single existing resource within the service
         """
-
-        # Follow_redirects is set to True to facilitate report downloads
-        async with httpx.AsyncClient(
-            base_url=self.base_url, timeout=60, follow_redirects=True
-        ) as client:
+        async with self.session() as client:
             path = f"{service}/{resource_id}"
             self.logger.info("Fetching data from %s %s", service, resource_id)
-            response = await self.client_request(client, "get", path, {})
-            data = response.json()
-            errors = data.get("errors", [])
-            if errors:
-                raise APIError(errors)
+            # Follow_redirects is set to True to facilitate report downloads
+            response = await self.client_request(
+                client, "get", path, {"follow_redirects": True}
+            )
+            data = self._page_data(response)
             results = data.get("data", {})
             return results
 
+    async def client_count(
+        self,
+        service: str,
+        param: dict = None,
+        filters: dict = None,
+    ) -> int:
+        """
+        Count existing resources within the service using a single request
+        Note: A single resource is requested without attributes and the count is
+        read from the record count in the response meta, or estimated from the
+        page count when the record count is not available
+        """
+        param = self._get_params(service, param, filters, page_size=1)
+        param[f"fields[{service.replace('_', '-')}]"] = ""
+        async with self.session() as client:
+            self.logger.info("Counting data from %s", service)
+            response = await self._get_page(client, service, param)
+            data = await self._decode_page(response)
+        meta = data.get("meta", {})
+        if "record-count" in meta:
+            return meta["record-count"]
+        if "page-count" in meta:
+            return meta["page-count"] * param["page[size]"]
+        return len(data.get("data", []))
+
     async def client_update(
         self,
         service: str,
@@ -176,101 +645,91 @@ class PlacementsIOClient:
         attributes: Union[callable, dict] = None,
         relationships: Union[callable, dict] = None,
         params: dict = None,
+        max_concurrency: int = None,
+        callback_concurrency: int = None,
     ) -> dict:
         """
         Update existing resources within the service
+        Note: At most `max_concurrency` updates are in flight at the same time,
+        defaulting to the write concurrency set on the instance, and at most
+        `callback_concurrency` attribute or relationship callbacks are awaited at
+        the same time, defaulting to the concurrency set on the instance
         """
         if not attributes and not relationships:
             raise ValueError(
                 "Must provide either attributes or relationships to update."
             )
 
-        async def get_responses(resource_ids: list) -> dict:
-
-            async def make_multiple_requests(resource_ids: int) -> dict:
-
-                async with httpx.AsyncClient(
-                    base_url=self.base_url, timeout=60
-                ) as client:
-                    tasks = []
-                    for resource_id in resource_ids:
-                        url = f"{service}/{resource_id}"
-
-                        attributes_payload = {}
-                        if isinstance(attributes, dict):
-                            attributes_payload = {"attributes": attributes}
-                        elif callable(attributes):
-                            attributes_payload = {
-                                "attributes": await attributes(resource_id)
-                            }
-
-                        relationships_payload = {}
-                        if isinstance(relationships, dict):
-                            relationships_payload = {"relationships": relationships}
-                        elif callable(relationships):
-                            relationships_payload = {
-                                "relationships": await relationships(resource_id)
-                            }
-
-                        payload = {
-                            "data": {
-                                "id": resource_id,
-                                "type": service,
-                                **attributes_payload,
-                                **relationships_payload,
-                            }
-                        }
-                        self.logger.info(
-                            "Updating %s %s",
-                            url,
-                            params,
-                        )
-                        self.logger.debug(
-                            "Payload: %s",
-                            json.dumps(payload, indent=4, default=str, cls=JSONEncoder),
-                        )
-                        tasks.append(
-                            self.client_request(
-                                client,
-                                "patch",
-                                url,
-                                {"data": payload, "params": params},
-                            )
-                        )
-                    return await asyncio.gather(*tasks)
-
-            responses_dict = {}
-            responses = await make_multiple_requests(resource_ids)
-            responses_dict.update(dict(zip(resource_ids, responses)))
-            return responses_dict
-
-        # Split resource_ids into chunks of 100
-        chunk_size = 100
-        raw_responses = {}
-        if isinstance(resource_ids, {}.keys().__class__):
-            resource_ids = list(resource_ids)
-        for index in range(0, len(resource_ids), chunk_size):
-            chunk = resource_ids[index : index + chunk_size]
-            chunk_responses = await get_responses(chunk)
-            raw_responses.update(chunk_responses)
+        async def resolve(value, resource_id):
+            if callable(value):
+                return await value(resource_id)
+            return value
 
-        expanded_responses = [
-            (
-                response.json().get(
-                    "data", {**response.json(), "links": {"self": response.request.url}}
-                )
-                if response.content
-                else {
-                    "errors": [
-                        {
-                            "title": "No data",
-                            "detail": "No data was returned in the API response",
-                        }
-                    ],
-                    "links": {"self": response.request.url},
+        async def build_payload(resource_id) -> dict:
+            # Attribute and relationship callbacks for a resource run together
+            attributes_value, relationships_value = await asyncio.gather(
+                resolve(attributes, resource_id),
+                resolve(relationships, resource_id),
+            )
+
+            attributes_payload = {}
+            if isinstance(attributes, dict) or callable(attributes):
+                attributes_payload = {"attributes": attributes_value}
+
+            relationships_payload = {}
+            if isinstance(relationships, dict) or callable(relationships):
+                relationships_payload = {"relationships": relationships_value}
+
+            return {
+                "data": {
+                    "id": resource_id,
+                    "type": service,
+                    **attributes_payload,
+                    **relationships_payload,
                 }
+            }
+
+        async def update_resource(client: httpx.AsyncClient, resource_id):
+            async with callback_limit:
+                payload = await build_payload(resource_id)
+
+            url = f"{service}/{resource_id}"
+            self.logger.info(
+                "Updating %s %s",
+                url,
+                params,
             )
-            for response in raw_responses.values()
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug(
+                    "Payload: %s",
+                    json.dumps(payload, indent=4, default=str, cls=JSONEncoder),
+                )
+            async with request_limit:
+                return await self.client_request(
+                    client,
+                    "patch",
+                    url,
+                    {"data": payload, "params": params},
+                )
+
+        # Payloads are built by callbacks running alongside the requests in flight
+        # and each request is sent as soon as its payload is ready, keeping a
+        # sliding window of requests in flight across every resource id
+        callback_concurrency = callback_concurrency or self.max_concurrency
+        max_concurrency = max_concurrency or self.write_concurrency
+        callback_limit = asyncio.Semaphore(callback_concurrency)
+        request_limit = asyncio.Semaphore(max_concurrency)
+        resource_ids = list(dict.fromkeys(resource_ids))
+        async with self.session() as client:
+            raw_responses = await gather_limited(
+                (update_resource(client, resource_id) for resource_id in resource_ids),
+                callback_concurrency + max_concurrency,
+            )
+        if self.cache is not None:
+            await call_blocking(self.cache, "invalidate", service)
+
+        expanded_responses = [
+            self._update_result(response) for response in raw_responses
         ]
         return expanded_responses
 
@@ -278,69 +737,138 @@ class PlacementsIOClient:
         self,
         service: str,
         objects: list[dict],
-    ) -> dict:
+        idempotency_key: Callable[[dict], str] = None,
+        max_concurrency: int = None,
+        max_retries: int = CREATE_MAX_RETRIES,
+    ) -> list:
         """
         Create new resources within the service
+        Note: Each object is retried on its own when its request fails with an
+        error which shows the request could not have reached the API, so that no
+        object is created twice. With an `idempotency_key`, a function returning
+        a key for each object, objects sharing a key are only created once.
         """
 
-        async def get_responses(objects: list) -> list:
-
-            async def make_multiple_requests(objects) -> list:
-                async with httpx.AsyncClient(
-                    base_url=self.base_url, timeout=60
-                ) as client:
-                    tasks = []
-                    for resources in objects:
-                        attributes = resources.get("attributes")
-                        relationships = resources.get("relationships")
-
-                        attributes_payload = {}
-                        if isinstance(attributes, dict):
-                            attributes_payload = {"attributes": attributes}
-
-                        relationships_payload = {}
-                        if isinstance(relationships, dict):
-                            relationships_payload = {"relationships": relationships}
-
-                        payload = {
-                            "data": {
-                                "type": service,
-                                **attributes_payload,
-                                **relationships_payload,
-                            }
-                        }
-                        tasks.append(
-                            self.client_request(
-                                client, "post", service, {"data": payload}
-                            )
-                        )
-                    return await asyncio.gather(*tasks)
-
-            attempts = 0
-            retry_after = 60
-            responses_final = []
-            while len(objects) != len(responses_final):
-                self.logger.info(objects)
-                if attempts:
-                    self.logger.warning("%s Resources remaining...", len(objects))
+        async def create_resource(client: httpx.AsyncClient, resources: dict):
+            attributes = resources.get("attributes")
+            relationships = resources.get("relationships")
+
+            attributes_payload = {}
+            if isinstance(attributes, dict):
+                attributes_payload = {"attributes": attributes}
+
+            relationships_payload = {}
+            if isinstance(relationships, dict):
+                relationships_payload = {"relationships": relationships}
+
+            payload = {
+                "data": {
+                    "type": service,
+                    **attributes_payload,
+                    **relationships_payload,
+                }
+            }
+            request = {"data": payload}
+
+            for attempt in range(max_retries + 1):
+                if attempt:
+                    delay = CREATE_RETRY_DELAY * 2 ** (attempt - 1)
                     self.logger.warning(
-                        "Waiting %s seconds before retrying...", retry_after
+                        "Retrying create on %s in %s seconds [Attempt %s of %s]",
+                        service,
+                        delay,
+                        attempt,
+                        max_retries,
+                    )
+                    await asyncio.sleep(delay)
+                try:
+                    response = await self.client_request(
+                        client, "post", service, request, is_retry=bool(attempt)
                     )
-                    await asyncio.sleep(retry_after)
-                responses = await make_multiple_requests(objects)
+                except httpx.TransportError as error:
+                    # Requests which were never sent are always safe to retry
+                    unsent = isinstance(error, UNSENT_ERRORS)
+                    if attempt < max_retries and unsent:
+                        continue
+                    self.logger.error("Unable to create on %s: %s", service, error)
+                    return {
+                        "errors": [
+                            {"title": type(error).__name__, "detail": str(error)}
+                        ]
+                    }
+                if response.status_code not in UNPROCESSED_STATUS_CODES:
+                    break
+            return self._create_result(response)
+
+        # Objects sharing an idempotency key are only sent once
+        keys = [
+            idempotency_key(resources) if idempotency_key else index
+            for index, resources in enumerate(objects)
+        ]
+        unique = {}
+        for key, resources in zip(keys, objects):
+            unique.setdefault(key, resources)
+
+        async with self.session() as client:
+            results = await gather_limited(
+                (create_resource(client, resources) for resources in unique.values()),
+                max_concurrency or self.write_concurrency,
+            )
+        if self.cache is not None:
+            await call_blocking(self.cache, "invalidate", service)
+        created = dict(zip(unique, results))
+        return [created[key] for key in keys]
 
-                # Now look for 429 responses to retry, or update the response with JSON
-                for response in responses:
-                    if response.status_code != 429:
-                        responses_final.append(response)
-                attempts += 1
-            return responses_final
+    def _create_result(self, response: httpx.Response) -> dict:
+        """
+        Expands a create response to the created resource or the errors returned
+        """
+        data = self._result_data(response)
+        return data.get("data", data)
 
-        raw_responses = await get_responses(objects)
-        expanded_responses = [
-            response.json().get("data", response.json()) for response in raw_responses
-        ]
-        return expanded_responses
+    def _update_result(self, response: httpx.Response) -> dict:
+        """
+        Expands an update response to the updated resource or the errors returned
+        """
+        data = self._result_data(response)
+        if "data" in data:
+            if self.entity_store is not None:
+                return self.entity_store.merge_all([data["data"]])[0]
+            return data["data"]
+        return {**data, "links": {"self": response.request.url}}
+
+    def _result_data(self, response: httpx.Response) -> dict:
+        """
+        Decodes a create or update response, or returns an error when it has no
+        body or its body is not a JSON object, such as an HTML error page
+        Note: Errors are returned rather than raised so one failed write does not
+        discard the results of the other writes made at the same time
+        """
+        if not response.content:
+            return {
+                "errors": [
+                    {
+                        "title": "No data",
+                        "detail": "No data was returned in the API response",
+                    }
+                ],
+                "links": {"self": response.request.url},
+            }
+        try:
+            data = self.codec.loads(response.content)
+        except ValueError:
+            data = None
+        if not isinstance(data, dict):
+            return {
+                "errors": [
+                    {
+                        "title": f"{response.status_code} {response.reason_phrase}",
+                        "detail": "The API response could not be decoded",
+                    }
+                ],
+                "links": {"self": response.request.url},
+            }
+        return data
 
     def _filter_values(self, params: dict = None) -> str:
         params = params or {}
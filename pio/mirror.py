@@ -0,0 +1,310 @@
+"""
+Placements.io Python SDK
+Local SQLite mirror of resources with indexed queries
+"""
+
+import asyncio
+import sqlite3
+import threading
+from typing import Union
+from pio.model.response import APIResponse
+from pio.utility.json_codec import JSONCodec, default_codec
+
+SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS resources (
+        type TEXT NOT NULL,
+        id TEXT NOT NULL,
+        attributes TEXT NOT NULL,
+        relationships TEXT NOT NULL,
+        PRIMARY KEY (type, id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS relationships (
+        type TEXT NOT NULL,
+        id TEXT NOT NULL,
+        name TEXT NOT NULL,
+        related_type TEXT,
+        related_id TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS relationships_resource
+    ON relationships (type, id)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS relationships_related
+    ON relationships (type, name, related_id)
+    """,
+]
+
+
+class Mirror:
+    """
+    Local mirror of resources stored in a SQLite database with one row per
+    resource, keyed by type and id.
+
+    Attributes and relationships are stored as JSON, and the ids of related
+    resources are stored in an indexed table so that resources can be queried
+    by their relationships. Attributes which are queried often may be indexed
+    with `index`. Query results are returned as an APIResponse, with any
+    included resources merged into their relationships.
+
+    The mirror may be used as the store of an incremental Sync, or loaded from
+    the results of Service.get, iter or iter_pages with `merge`. Changes are
+    written when `save` is called.
+    Note: The mirror is blocking, so `load` and Sync merge and save resources
+    from a thread rather than on the event loop. Its connection is shared
+    between threads, one call at a time.
+    """
+
+    blocking = True
+
+    def __init__(self, path: str, codec: JSONCodec = None):
+        self.path = path
+        self.codec = codec or default_codec()
+        self._lock = threading.RLock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        for statement in SCHEMA:
+            self.connection.execute(statement)
+        self.connection.commit()
+
+    def close(self):
+        """
+        Closes the database connection without saving uncommitted changes
+        """
+        with self._lock:
+            self.connection.close()
+
+    def save(self):
+        """
+        Writes merged resources to the database
+        """
+        with self._lock:
+            self.connection.commit()
+
+    def merge(self, service: str, resources: list):
+        """
+        Adds or updates resources, and the included resources of an APIResponse,
+        by type and id
+        Note: Resources without a type are stored under the type of the service and
+        relationships are stored as resource identifiers, so merged included
+        resources are not duplicated into each resource.
+        """
+        with self._lock:
+            for resource in resources:
+                self._merge_resource(service, resource)
+            for resource in getattr(resources, "included", None) or []:
+                self._merge_resource(resource.get("type"), resource)
+
+    async def load(self, service, **kwargs) -> int:
+        """
+        Loads every resource from a service, and any included resources, into
+        the mirror and saves it, returning the number of resources loaded
+        Note: Keyword arguments are passed to Service.iter_pages. Pages are merged
+        in a thread so that the event loop is not blocked.
+        """
+        count = 0
+        async for page in service.iter_pages(**kwargs):
+            await asyncio.to_thread(self.merge, service.service, page)
+            count += len(page)
+        await asyncio.to_thread(self.save)
+        return count
+
+    def index(self, service: str, attribute: str):
+        """
+        Creates an index on an attribute so that queries on it do not scan
+        every resource of the service
+        """
+        name = f"resources_{self._type(service)}_{attribute}".replace('"', "")
+        with self._lock:
+            self.connection.execute(
+                f'CREATE INDEX IF NOT EXISTS "{name}"'
+                f" ON resources (type, {self._extract(attribute)})"
+            )
+            self.connection.commit()
+
+    def query(
+        self,
+        service: str,
+        attributes: dict = None,
+        relationships: dict = None,
+        include: list = None,
+        limit: int = None,
+    ) -> APIResponse:
+        """
+        Returns resources of a service whose attributes and related resource ids
+        match the provided values, e.g. line items in campaign 1234 which are
+        delivering: query("line_items", {"delivery-status": "delivering"},
+        {"campaign": 1234})
+        Note: Related resources named in `include`, including nested relationship
+        paths such as "campaign.advertiser", are merged into the results when
+        they are in the mirror
+        """
+        sql = """
+            SELECT resources.type, resources.id, attributes, resources.relationships
+            FROM resources
+        """
+        params = []
+        for number, (name, value) in enumerate((relationships or {}).items()):
+            sql += f"""
+                JOIN relationships AS r{number}
+                ON r{number}.type = resources.type AND r{number}.id = resources.id
+                AND r{number}.name = ? AND r{number}.related_id = ?
+            """
+            params.extend([name, str(value)])
+        sql += " WHERE resources.type = ?"
+        params.append(self._type(service))
+        for attribute, value in (attributes or {}).items():
+            # Paths are not bound as parameters so that attribute indexes are used
+            sql += f" AND {self._extract(attribute)} = ?"
+            params.append(value)
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            rows = self.connection.execute(sql, params).fetchall()
+            data = [self._resource(row) for row in rows]
+            included = self._included(data, include or [])
+        return APIResponse(
+            data=data, included=included, meta={"record-count": len(data)}
+        )
+
+    def get(self, service: str, resource_id: Union[int, str]) -> dict:
+        """
+        Returns a single resource of a service, or None
+        """
+        with self._lock:
+            row = self.connection.execute(
+                """
+                SELECT type, id, attributes, relationships FROM resources
+                WHERE type = ? AND id = ?
+                """,
+                (self._type(service), str(resource_id)),
+            ).fetchone()
+        return self._resource(row) if row else None
+
+    def _merge_resource(self, service: str, resource: dict):
+        """
+        Adds a resource, or merges it into the stored resource, and replaces the
+        relationship rows of its relationships which carry data
+        Note: Like EntityStore.merge, attributes and relationships missing from
+        the resource, such as those left out by sparse fieldsets or returned as
+        links only, keep their stored values
+        """
+        resource_type = resource.get("type") or self._type(service)
+        resource_id = str(resource.get("id"))
+        row = self.connection.execute(
+            "SELECT attributes, relationships FROM resources WHERE type = ? AND id = ?",
+            (resource_type, resource_id),
+        ).fetchone()
+        attributes, relationships = {}, {}
+        if row is not None:
+            attributes = self.codec.loads(row[0])
+            relationships = self.codec.loads(row[1])
+        attributes.update(resource.get("attributes") or {})
+        replaced = []
+        related = []
+        for name, relationship in (resource.get("relationships") or {}).items():
+            if not isinstance(relationship, dict):
+                continue
+            stored = relationships.setdefault(name, {})
+            stored.update(
+                {key: value for key, value in relationship.items() if key != "data"}
+            )
+            if "data" not in relationship:
+                continue
+            data = relationship["data"]
+            identifiers = data if isinstance(data, list) else [data]
+            identifiers = [
+                {"type": identifier.get("type"), "id": identifier.get("id")}
+                for identifier in identifiers
+                if isinstance(identifier, dict)
+            ]
+            stored["data"] = (
+                identifiers if isinstance(data, list) else (identifiers or [None])[0]
+            )
+            replaced.append((resource_type, resource_id, name))
+            related.extend(
+                (
+                    resource_type,
+                    resource_id,
+                    name,
+                    identifier["type"],
+                    str(identifier["id"]),
+                )
+                for identifier in identifiers
+            )
+        self.connection.execute(
+            "INSERT OR REPLACE INTO resources VALUES (?, ?, ?, ?)",
+            (
+                resource_type,
+                resource_id,
+                self.codec.dumps(attributes).decode(),
+                self.codec.dumps(relationships).decode(),
+            ),
+        )
+        self.connection.executemany(
+            "DELETE FROM relationships WHERE type = ? AND id = ? AND name = ?",
+            replaced,
+        )
+        self.connection.executemany(
+            "INSERT INTO relationships VALUES (?, ?, ?, ?, ?)", related
+        )
+
+    def _resource(self, row: tuple) -> dict:
+        """
+        Builds a JSON:API resource from a row of the resources table
+        """
+        resource_type, resource_id, attributes, relationships = row
+        resource = {
+            "type": resource_type,
+            "id": resource_id,
+            "attributes": self.codec.loads(attributes),
+        }
+        relationships = self.codec.loads(relationships)
+        if relationships:
+            resource["relationships"] = relationships
+        return resource
+
+    def _included(self, data: list, include: list) -> list:
+        """
+        Returns the resources related to the data through the include paths
+        """
+        included = {}
+        for path in include:
+            resources = data
+            for name in path.split("."):
+                identifiers = {}
+                for resource in resources:
+                    relationship = resource.get("relationships", {}).get(name) or {}
+                    related = relationship.get("data")
+                    for identifier in (
+                        related if isinstance(related, list) else [related]
+                    ):
+                        if identifier:
+                            key = (identifier["type"], str(identifier["id"]))
+                            identifiers[key] = None
+                resources = []
+                for key in identifiers:
+                    if key not in included:
+                        resource = self.get(*key)
+                        if resource is None:
+                            continue
+                        included[key] = resource
+                    resources.append(included[key])
+        return list(included.values())
+
+    def _type(self, service: str) -> str:
+        """
+        Returns the resource type of a service, e.g. line-items for line_items
+        """
+        return service.replace("_", "-")
+
+    def _extract(self, attribute: str) -> str:
+        """
+        Returns the SQL expression extracting an attribute from its JSON
+        """
+        path = attribute.replace("'", "''").replace('"', '\\"')
+        return f"""json_extract(attributes, '$."{path}"')"""
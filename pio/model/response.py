@@ -3,9 +3,163 @@ APIResponse class for handling JSON:API responses with included resources.
 
 This module provides the APIResponse class that wraps API response data,
 merges included resources into relationship data, and maintains backward
-compatibility by inheriting from list.
+compatibility by inheriting from list. Relationships may alternatively be
+resolved lazily using LazyRelationship objects backed by an IncludedIndex.
 """
 
+import functools
+
+
+class IncludedIndex:
+    """
+    Index of included resources keyed by (type, id).
+
+    Each included resource is copied and wrapped with lazy relationships the first
+    time it is referenced, and that copy is shared by every later reference.
+    References from an included resource to a resource which can already reach it
+    through resolved relationships (cycles such as campaign -> opportunity ->
+    campaign) are left as resource identifiers, so like eager responses a lazy
+    response never contains circular references.
+    """
+
+    def __init__(self, included):
+        self.resources = {
+            (resource.get("type"), resource.get("id")): resource
+            for resource in included
+        }
+        self.resolved = {}
+        self.references = {}
+
+    def resolve(self, identifier, owner=None):
+        """
+        Returns the included resource for a resource identifier, or the resource
+        identifier itself when the resource was not included or when resolving it
+        from the included resource `owner`, keyed by (type, id), would create a
+        circular reference
+        """
+        key = (identifier.get("type"), identifier.get("id"))
+        if key not in self.resources:
+            return identifier
+        if owner is not None:
+            if self.reaches(key, owner):
+                return identifier
+            self.references.setdefault(owner, set()).add(key)
+        if key in self.resolved:
+            return self.resolved[key]
+        merged = self.resolved[key] = {**self.resources[key]}
+        relationships = merged.get("relationships")
+        if isinstance(relationships, dict):
+            # Relationships are copied so the included array is not modified
+            merged["relationships"] = dict(relationships)
+        return self.wrap(merged, owner=key)
+
+    def reaches(self, start, target) -> bool:
+        """
+        Returns whether the resource keyed by `target` is reachable from the
+        resource keyed by `start` through relationships resolved so far
+        """
+        stack = [start]
+        seen = {start}
+        while stack:
+            key = stack.pop()
+            if key == target:
+                return True
+            for reference in self.references.get(key, ()):
+                if reference not in seen:
+                    seen.add(reference)
+                    stack.append(reference)
+        return False
+
+    def wrap(self, obj, owner=None):
+        """
+        Replaces the relationships of a resource with lazy relationships
+        Note: `owner` is the (type, id) of an included resource, which is used to
+        detect circular references
+        """
+        if not isinstance(obj, dict):
+            return obj
+        relationships = obj.get("relationships")
+        if isinstance(relationships, dict):
+            for rel_name, rel_data in relationships.items():
+                if isinstance(rel_data, dict):
+                    relationships[rel_name] = LazyRelationship(rel_data, self, owner)
+        return obj
+
+
+class LazyRelationship(dict):
+    """
+    Relationship object whose data is resolved against the included resources the
+    first time the relationship is read. It otherwise behaves as a dict, including
+    when it is copied or serialized to JSON.
+    """
+
+    __slots__ = ("_index", "_owner")
+
+    def __init__(self, relationship, index, owner=None):
+        super().__init__(relationship)
+        self._index = index
+        self._owner = owner
+
+    def _resolve(self):
+        index = self._index
+        if index is None:
+            return
+        self._index = None
+        resolve = index.resolve
+        if self._owner is not None:
+            resolve = functools.partial(index.resolve, owner=self._owner)
+        rel_data_obj = dict.get(self, "data")
+        if isinstance(rel_data_obj, dict):
+            dict.__setitem__(self, "data", resolve(rel_data_obj))
+        elif isinstance(rel_data_obj, list):
+            dict.__setitem__(
+                self,
+                "data",
+                [
+                    resolve(item) if isinstance(item, dict) else item
+                    for item in rel_data_obj
+                ],
+            )
+
+    def __getitem__(self, key):
+        self._resolve()
+        return super().__getitem__(key)
+
+    def __iter__(self):
+        self._resolve()
+        return super().__iter__()
+
+    def __eq__(self, other):
+        self._resolve()
+        if isinstance(other, LazyRelationship):
+            other._resolve()
+        return super().__eq__(other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        self._resolve()
+        return super().__repr__()
+
+    def get(self, key, default=None):
+        self._resolve()
+        return super().get(key, default)
+
+    def items(self):
+        self._resolve()
+        return super().items()
+
+    def values(self):
+        self._resolve()
+        return super().values()
+
+    def copy(self):
+        self._resolve()
+        return dict(self)
+
 
 class APIResponse(list):
     """
@@ -31,7 +185,7 @@ class APIResponse(list):
         >>> print(response.included)
     """
 
-    def __init__(self, data, included=None, meta=None):
+    def __init__(self, data, included=None, meta=None, max_depth=None, lazy=False):
         """
         Initialize API response.
 
@@ -39,12 +193,19 @@ class APIResponse(list):
             data: List of resource objects from the API response.
             included: List of included resource objects.
             meta: Metadata from the API response.
+            max_depth: Maximum depth of nested relationships to merge included
+                resources into. None merges every level.
+            lazy: Resolve relationship data against included resources when it
+                is first accessed rather than when the response is built.
         """
         self.included = included or []
         self.meta = meta or {}
 
         # Merge included resources into relationship data
-        merged_data = self._merge_included(data, self.included)
+        if lazy:
+            merged_data = self._lazy_included(data, self.included)
+        else:
+            merged_data = self._merge_included(data, self.included, max_depth)
 
         # Initialize list with merged data
         if isinstance(merged_data, list):
@@ -52,7 +213,7 @@ class APIResponse(list):
         else:
             super().__init__([merged_data] if merged_data else [])
 
-    def _merge_included(self, data, included):
+    def _merge_included(self, data, included, max_depth=None):
         """
         Merge included resources into their corresponding relationships.
 
@@ -60,14 +221,22 @@ class APIResponse(list):
         find the matching resource in the included array and merge its
         full attributes and relationships into the relationship data.
 
+        Each included resource is resolved once and shared by every relationship
+        which references it, so resolution is linear in the size of data and
+        included. References back to a resource which is still being resolved
+        (cycles such as campaign -> opportunity -> campaign) are left as
+        resource identifiers so the result never contains circular references.
+        The included array itself is not modified.
+
         Args:
             data: List of primary resource objects.
             included: List of included resource objects.
+            max_depth: Maximum depth of nested relationships to merge.
 
         Returns:
             Data with included resources merged into relationships.
         """
-        if not included:
+        if not included or max_depth == 0:
             return data
 
         # Create lookup dict for included resources: {(type, id): resource}
@@ -75,49 +244,74 @@ class APIResponse(list):
             (resource.get("type"), resource.get("id")): resource
             for resource in included
         }
+        # Resolved included resources keyed by (type, id), or by ((type, id), depth)
+        # when the depth is limited as the same resource is merged to a different
+        # depth depending on where it is referenced
+        resolved = {}
+        path = set()
 
-        def merge_relationships(obj):
-            """Recursively merge included resources into an object's relationships."""
-            if not isinstance(obj, dict):
-                return obj
-
-            # Process relationships if they exist
-            relationships = obj.get("relationships", {})
-            for rel_name, rel_data in relationships.items():
+        def references(obj, copy):
+            """
+            Returns (container, slot, identifier) for each relationship of an
+            object, copying the relationships of included resources first
+            """
+            relationships = obj.get("relationships")
+            if not isinstance(relationships, dict):
+                return []
+            if copy:
+                relationships = obj["relationships"] = {
+                    rel_name: {**rel_data} if isinstance(rel_data, dict) else rel_data
+                    for rel_name, rel_data in relationships.items()
+                }
+            refs = []
+            for rel_data in relationships.values():
                 if not isinstance(rel_data, dict):
                     continue
-
                 rel_data_obj = rel_data.get("data")
 
-                if rel_data_obj is None:
-                    continue
-
                 # Handle to-one relationships (single object)
                 if isinstance(rel_data_obj, dict):
-                    key = (rel_data_obj.get("type"), rel_data_obj.get("id"))
-                    if key in included_map:
-                        # Merge the full included resource
-                        merged = {**included_map[key]}
-                        # Recursively merge nested relationships
-                        merge_relationships(merged)
-                        rel_data["data"] = merged
+                    refs.append((rel_data, "data", rel_data_obj))
 
                 # Handle to-many relationships (array of objects)
                 elif isinstance(rel_data_obj, list):
-                    merged_list = []
-                    for item in rel_data_obj:
-                        if not isinstance(item, dict):
-                            merged_list.append(item)
-                            continue
-                        key = (item.get("type"), item.get("id"))
-                        if key in included_map:
-                            merged = {**included_map[key]}
-                            merge_relationships(merged)
-                            merged_list.append(merged)
-                        else:
-                            merged_list.append(item)
-                    rel_data["data"] = merged_list
+                    rel_data_obj = rel_data["data"] = list(rel_data_obj)
+                    refs.extend(
+                        (rel_data_obj, index, item)
+                        for index, item in enumerate(rel_data_obj)
+                        if isinstance(item, dict)
+                    )
+            return refs
+
+        def merge_relationships(obj):
+            """Merge included resources into an object's relationships."""
+            if not isinstance(obj, dict):
+                return obj
 
+            # Depth first traversal with an explicit stack so deep include chains
+            # are not limited by the recursion limit
+            stack = [(None, iter(references(obj, copy=False)), 1)]
+            while stack:
+                key, refs, depth = stack[-1]
+                for container, slot, identifier in refs:
+                    target = (identifier.get("type"), identifier.get("id"))
+                    if target not in included_map or target in path:
+                        continue
+                    memo = target if max_depth is None else (target, depth)
+                    if memo in resolved:
+                        container[slot] = resolved[memo]
+                        continue
+                    merged = resolved[memo] = {**included_map[target]}
+                    container[slot] = merged
+                    if max_depth is None or depth < max_depth:
+                        path.add(target)
+                        stack.append(
+                            (target, iter(references(merged, copy=True)), depth + 1)
+                        )
+                        break
+                else:
+                    stack.pop()
+                    path.discard(key)
             return obj
 
         # Process each item in data
@@ -126,6 +320,26 @@ class APIResponse(list):
         else:
             return merge_relationships(data)
 
+    def _lazy_included(self, data, included):
+        """
+        Wrap relationships so included resources are merged when first accessed.
+
+        Args:
+            data: List of primary resource objects.
+            included: List of included resource objects.
+
+        Returns:
+            Data with relationships which resolve against the included resources.
+        """
+        if not included:
+            return data
+
+        index = IncludedIndex(included)
+        if isinstance(data, list):
+            return [index.wrap(item) for item in data]
+        else:
+            return index.wrap(data)
+
     def __repr__(self):
         """String representation."""
         return (
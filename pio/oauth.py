@@ -6,7 +6,19 @@ import logging
 import datetime
 import httpx
 import time
+from concurrent.futures import Executor
+from typing import Union
 from pio.model.environment import API
+from pio.utility.connection import DEFAULT_TIMEOUT
+from pio.utility.concurrency import (
+    DEFAULT_MAX_CONCURRENCY,
+    DEFAULT_WRITE_CONCURRENCY,
+)
+from pio.utility.rate_limiter import RateLimiter
+from pio.utility.json_codec import JSONCodec
+from pio.utility.page_size import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from pio.utility.cache import Cache
+from pio.utility.entity_store import EntityStore
 from pio.model.oauth import ModelScopes
 from pio.pio import PlacementsIO
 
@@ -57,6 +69,19 @@ class PlacementsIO_OAuth(PlacementsIO):
         redirect_host: str = "http://localhost",
         redirect_port: int = 17927,
         scopes: ModelScopes = None,
+        limits: httpx.Limits = None,
+        timeout: float = DEFAULT_TIMEOUT,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        write_concurrency: int = DEFAULT_WRITE_CONCURRENCY,
+        rate_limiter: RateLimiter = None,
+        codec: JSONCodec = None,
+        executor: Union[str, Executor] = None,
+        workers: int = None,
+        page_size: Union[int, str] = DEFAULT_PAGE_SIZE,
+        page_sizes: dict = None,
+        max_page_size: int = MAX_PAGE_SIZE,
+        cache: Cache = None,
+        entity_store: EntityStore = None,
     ):
         self.base_url = API[environment]
         self.oauth_base_url = self.base_url.replace("/v1/", "/oauth/")
@@ -78,11 +103,21 @@ class PlacementsIO_OAuth(PlacementsIO):
             f"&redirect_uri={self.redirect_host}:{self.redirect_port}"
             f"&response_type=code{scopes_param}"
         )
-        self.settings = {
-            "base_url": self.base_url,
-            "token": self.token,
-        }
-        self.logger = logging.getLogger("pio")
+        self._configure(
+            limits=limits,
+            timeout=timeout,
+            max_concurrency=max_concurrency,
+            write_concurrency=write_concurrency,
+            rate_limiter=rate_limiter,
+            codec=codec,
+            executor=executor,
+            workers=workers,
+            page_size=page_size,
+            page_sizes=page_sizes,
+            max_page_size=max_page_size,
+            cache=cache,
+            entity_store=entity_store,
+        )
 
     def get_auth_url(self):
         return self.auth_url
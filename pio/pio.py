@@ -3,14 +3,28 @@ Placements.io Python SDK
 """
 
 import os
+import asyncio
 import logging
 import datetime
-import csv
-import time
-from typing import Unpack, Union
+from concurrent.futures import Executor
+from typing import AsyncIterator, Callable, Unpack, Union
 from pio.client import PlacementsIOClient
 from pio.model.response import APIResponse
 from pio.error.api_error import APIError
+from pio.utility.connection import ConnectionPool, DEFAULT_TIMEOUT
+from pio.utility.concurrency import (
+    gather_limited,
+    DEFAULT_MAX_CONCURRENCY,
+    DEFAULT_WRITE_CONCURRENCY,
+)
+from pio.utility.rate_limiter import RateLimiter
+from pio.utility.json_codec import JSONCodec, default_codec
+from pio.utility.csv_reader import iterate_csv
+from pio.utility.worker_pool import WorkerPool
+from pio.utility.page_size import PageSizeTuner, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from pio.utility.cache import Cache
+from pio.utility.entity_store import EntityStore
+from pio.utility.single_flight import SingleFlight
 from pio.model.environment import API
 from pio.model.report import COLUMNS
 from pio.model.get import (
@@ -39,7 +53,24 @@ class PlacementsIO:
     Placements.io Python SDK
     """
 
-    def __init__(self, environment: str = None, token: str = None):
+    def __init__(
+        self,
+        environment: str = None,
+        token: str = None,
+        limits: httpx.Limits = None,
+        timeout: float = DEFAULT_TIMEOUT,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        write_concurrency: int = DEFAULT_WRITE_CONCURRENCY,
+        rate_limiter: RateLimiter = None,
+        codec: JSONCodec = None,
+        executor: Union[str, Executor] = None,
+        workers: int = None,
+        page_size: Union[int, str] = DEFAULT_PAGE_SIZE,
+        page_sizes: dict = None,
+        max_page_size: int = MAX_PAGE_SIZE,
+        cache: Cache = None,
+        entity_store: EntityStore = None,
+    ):
         environment = (
             environment or os.environ.get(f"PLACEMENTS_IO_ENVIRONMENT") or "staging"
         )
@@ -49,23 +80,108 @@ class PlacementsIO:
             or os.environ.get(f"PLACEMENTS_IO_TOKEN_{environment.upper()}")
             or os.environ.get("PLACEMENTS_IO_TOKEN")
         )
+        self._configure(
+            limits=limits,
+            timeout=timeout,
+            max_concurrency=max_concurrency,
+            write_concurrency=write_concurrency,
+            rate_limiter=rate_limiter,
+            codec=codec,
+            executor=executor,
+            workers=workers,
+            page_size=page_size,
+            page_sizes=page_sizes,
+            max_page_size=max_page_size,
+            cache=cache,
+            entity_store=entity_store,
+        )
+
+    def _configure(
+        self,
+        limits: httpx.Limits = None,
+        timeout: float = DEFAULT_TIMEOUT,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        write_concurrency: int = DEFAULT_WRITE_CONCURRENCY,
+        rate_limiter: RateLimiter = None,
+        codec: JSONCodec = None,
+        executor: Union[str, Executor] = None,
+        workers: int = None,
+        page_size: Union[int, str] = DEFAULT_PAGE_SIZE,
+        page_sizes: dict = None,
+        max_page_size: int = MAX_PAGE_SIZE,
+        cache: Cache = None,
+        entity_store: EntityStore = None,
+    ):
+        """
+        Creates the connection pool, rate limiter and other objects shared by
+        every service, and the settings each service is created with
+        Note: Subclasses call this once `base_url` and `token` are set
+        """
         self.logger = logging.getLogger("pio")
+        self.connection = ConnectionPool(
+            base_url=self.base_url, limits=limits, timeout=timeout
+        )
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.codec = codec or default_codec()
+        self.worker_pool = WorkerPool(executor=executor, workers=workers)
+        self.page_tuner = PageSizeTuner(max_size=max_page_size)
+        self.cache = cache
+        self.entity_store = entity_store
+        self.single_flight = SingleFlight()
         self.settings = {
             "base_url": self.base_url,
             "token": self.token,
+            "connection": self.connection,
+            "max_concurrency": max_concurrency,
+            "write_concurrency": write_concurrency,
+            "rate_limiter": self.rate_limiter,
+            "codec": self.codec,
+            "worker_pool": self.worker_pool,
+            "page_size": page_size,
+            "page_sizes": page_sizes,
+            "max_page_size": max_page_size,
+            "page_tuner": self.page_tuner,
+            "cache": self.cache,
+            "entity_store": self.entity_store,
+            "single_flight": self.single_flight,
         }
 
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def aclose(self):
+        """
+        Closes the shared connection pool and worker pool used by every service
+        """
+        await self.connection.aclose()
+        self.worker_pool.shutdown()
+
+    async def count(self, services: dict, max_concurrency: int = None) -> dict:
+        """
+        Counts existing resources in several services at the same time
+        Note: `services` maps service names to the filters for each service, e.g.
+        {"line_items": {"campaign_id": 1}, "accounts": {}}
+        """
+        counts = await gather_limited(
+            (
+                getattr(self, service).count(**(filters or {}))
+                for service, filters in services.items()
+            ),
+            max_concurrency or self.settings["max_concurrency"],
+        )
+        return dict(zip(services, counts))
+
     def relationship(self, relationship_url: str):
         """
         Returns a Service class from a relationship URL provided for a previous API call
         """
         return self.Service(
-            **{
-                "base_url": self.base_url,
-                "token": self.token,
-                "service": relationship_url.replace(self.base_url, ""),
-                "model": {"get": ModelFilterDefaults},
-            }
+            **self.settings,
+            service=relationship_url.replace(self.base_url, ""),
+            model={"get": ModelFilterDefaults},
         )
 
     class Service(PlacementsIOClient):
@@ -85,10 +201,16 @@ class PlacementsIO:
             include: list = None,
             fields: Union[list, dict] = None,
             params: dict = None,
+            max_concurrency: int = None,
+            lazy: bool = False,
+            page_size: Union[int, str] = None,
+            limit: int = None,
             **args: Unpack[ModelFilterAccount],
         ) -> APIResponse:
             """
             Get existing resources within the service
+            Note: When `limit` is set pagination stops once `limit` resources have
+            been downloaded
             """
             return await self.client(
                 service=self.service,
@@ -96,14 +218,163 @@ class PlacementsIO:
                 filters=args,
                 fields=fields,
                 param=params,
+                max_concurrency=max_concurrency,
+                lazy=lazy,
+                page_size=page_size,
+                limit=limit,
+            )
+
+        async def first(
+            self,
+            include: list = None,
+            fields: Union[list, dict] = None,
+            params: dict = None,
+            lazy: bool = False,
+            **args: Unpack[ModelFilterAccount],
+        ) -> Union[dict, None]:
+            """
+            Get the first existing resource within the service matching the filters
+            in a single request, or None when there are no matches
+            """
+            response = await self.get(
+                include=include,
+                fields=fields,
+                params=params,
+                lazy=lazy,
+                limit=1,
+                **args,
+            )
+            return response[0] if response else None
+
+        async def exists(
+            self,
+            params: dict = None,
+            **args: Unpack[ModelFilterAccount],
+        ) -> bool:
+            """
+            Returns whether any existing resource within the service matches the
+            filters using a single request
+            """
+            return await self.first(params=params, **args) is not None
+
+        async def count(
+            self,
+            params: dict = None,
+            **args: Unpack[ModelFilterAccount],
+        ) -> int:
+            """
+            Count existing resources within the service matching the filters
+            using a single request
+            """
+            return await self.client_count(
+                service=self.service, param=params, filters=args
+            )
+
+        async def count_many(
+            self, filters: list[dict], max_concurrency: int = None
+        ) -> list[int]:
+            """
+            Count existing resources within the service for several sets of
+            filters at the same time, returned in the order of the filters
+            """
+            return await gather_limited(
+                (self.count(**args) for args in filters),
+                max_concurrency or self.max_concurrency,
+            )
+
+        async def get_many(
+            self,
+            resource_ids: list,
+            include: list = None,
+            fields: Union[list, dict] = None,
+            params: dict = None,
+            max_concurrency: int = None,
+            lazy: bool = False,
+            page_size: Union[int, str] = None,
+            **args: Unpack[ModelFilterAccount],
+        ) -> dict:
+            """
+            Get existing resources within the service for many IDs at the same time,
+            returned in a dictionary keyed by the provided IDs
+            """
+            return await self.client_many(
+                service=self.service,
+                resource_ids=resource_ids,
+                includes=include,
+                filters=args,
+                fields=fields,
+                param=params,
+                max_concurrency=max_concurrency,
+                lazy=lazy,
+                page_size=page_size,
             )
 
+        async def iter_pages(
+            self,
+            include: list = None,
+            fields: Union[list, dict] = None,
+            params: dict = None,
+            max_concurrency: int = None,
+            lazy: bool = False,
+            page_size: Union[int, str] = None,
+            **args: Unpack[ModelFilterAccount],
+        ) -> AsyncIterator[APIResponse]:
+            """
+            Yields each page of existing resources within the service as soon as it
+            has been downloaded, reading ahead by at most `max_concurrency` pages
+            """
+            pages = self.client_pages(
+                service=self.service,
+                includes=include,
+                filters=args,
+                fields=fields,
+                param=params,
+                max_concurrency=max_concurrency,
+                page_size=page_size,
+            )
+            async for page in pages:
+                yield await self._response(
+                    page.get("data", []),
+                    page.get("included", []),
+                    page.get("meta", {}),
+                    lazy,
+                )
+
+        async def iter(
+            self,
+            include: list = None,
+            fields: Union[list, dict] = None,
+            params: dict = None,
+            max_concurrency: int = None,
+            lazy: bool = False,
+            page_size: Union[int, str] = None,
+            **args: Unpack[ModelFilterAccount],
+        ) -> AsyncIterator[dict]:
+            """
+            Yields existing resources within the service as soon as the page
+            containing them has been downloaded
+            """
+            pages = self.iter_pages(
+                include=include,
+                fields=fields,
+                params=params,
+                max_concurrency=max_concurrency,
+                lazy=lazy,
+                page_size=page_size,
+                **args,
+            )
+            async for page in pages:
+                for resource in page:
+                    yield resource
+
         async def update(
             self,
             resource_ids: list,
             attributes: Union[callable, dict] = None,
             relationships: Union[callable, dict] = None,
             params: dict = None,
+            max_concurrency: int = None,
+            callback_concurrency: int = None,
         ) -> dict:
             """
             Update existing resources within the service
@@ -114,11 +385,15 @@ class PlacementsIO:
                 attributes=attributes,
                 relationships=relationships,
                 params=params,
+                max_concurrency=max_concurrency,
+                callback_concurrency=callback_concurrency,
             )
 
         async def create(
             self,
             objects: list[dict],
+            idempotency_key: Callable[[dict], str] = None,
+            max_concurrency: int = None,
         ) -> dict:
             """
             Create new resources within the service
@@ -126,6 +401,8 @@ class PlacementsIO:
             return await self.client_create(
                 service=self.service,
                 objects=objects,
+                idempotency_key=idempotency_key,
+                max_concurrency=max_concurrency,
             )
 
     class ReportService(Service):
@@ -139,6 +416,10 @@ class PlacementsIO:
         TODAY_END = datetime.datetime.now(datetime.timezone.utc).replace(
             hour=23, minute=59, second=59, microsecond=999
         )
+        PENDING_STATUSES = ["pending", "in_progress"]
+        POLL_INTERVAL = 5
+        POLL_BACKOFF = 1.5
+        POLL_MAX_INTERVAL = 60
 
         async def create(
             self, start_date=TODAY_START, end_date=TODAY_END, columns: list = COLUMNS
@@ -169,43 +450,127 @@ class PlacementsIO:
             """
             return await self.resource(service=self.service, resource_id=resource_id)
 
-        async def data(self, report_id: dict) -> list:
+        async def wait(
+            self,
+            report_id: int,
+            interval: float = None,
+            backoff: float = None,
+            max_interval: float = None,
+            timeout: float = None,
+        ) -> dict:
             """
-            Returns report data in a list of dictionaries
+            Polls the report until it is no longer pending or in progress and
+            returns the report, raising an APIError if the report failed
             """
-
-            report_response = await self.get(report_id)
-            status = report_response.get("attributes", {}).get("status")
-            while status in ["pending", "in_progress"]:
-                self.logger.info(f"Report is currently {status}. Retrying in 5 seconds")
-                time.sleep(5)
-                report_response = await self.get(report_id)
-                status = report_response.get("attributes", {}).get("status")
-            if status == "failed":
+            reports = await self.wait_many(
+                [report_id],
+                interval=interval,
+                backoff=backoff,
+                max_interval=max_interval,
+                timeout=timeout,
+            )
+            report_response = reports[report_id]
+            if report_response.get("attributes", {}).get("status") == "failed":
                 raise APIError(
                     report_response.get("attributes", {}).get("error-message")
                 )
+            return report_response
 
+        async def wait_many(
+            self,
+            report_ids: list,
+            interval: float = None,
+            backoff: float = None,
+            max_interval: float = None,
+            timeout: float = None,
+        ) -> dict:
+            """
+            Polls several reports at the same time until none are pending or in
+            progress and returns the reports keyed by report id
+            Note: The time between polls starts at `interval` seconds and grows by
+            a factor of `backoff` up to `max_interval` seconds. A TimeoutError is
+            raised if the reports are not ready within `timeout` seconds.
+            """
+            interval = interval or self.POLL_INTERVAL
+            backoff = backoff or self.POLL_BACKOFF
+            max_interval = max_interval or self.POLL_MAX_INTERVAL
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + timeout if timeout else None
+
+            reports = {}
+            pending = list(dict.fromkeys(report_ids))
+            while True:
+                responses = await asyncio.gather(
+                    *[self.get(report_id) for report_id in pending]
+                )
+                reports.update(zip(pending, responses))
+                pending = [
+                    report_id
+                    for report_id in pending
+                    if reports[report_id].get("attributes", {}).get("status")
+                    in self.PENDING_STATUSES
+                ]
+                if not pending:
+                    return {report_id: reports[report_id] for report_id in report_ids}
+
+                delay = interval
+                if deadline is not None:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        raise TimeoutError(
+                            f"Reports {pending} were not ready within {timeout} seconds"
+                        )
+                    delay = min(delay, remaining)
+                self.logger.info(
+                    "%s Reports are currently pending. Retrying in %s seconds",
+                    len(pending),
+                    round(delay, 2),
+                )
+                await asyncio.sleep(delay)
+                interval = min(max_interval, interval * backoff)
+
+        async def data(self, report_id: dict, timeout: float = None) -> list:
+            """
+            Returns report data in a list of dictionaries
+            """
+            return [row async for row in self.iter_rows(report_id, timeout=timeout)]
+
+        async def iter_rows(
+            self, report_id: int, as_tuples: bool = False, timeout: float = None
+        ) -> AsyncIterator[Union[dict, tuple]]:
+            """
+            Yields report data one row at a time as the report is downloaded
+            Note: Rows are dictionaries keyed by the report header. When `as_tuples`
+            is set the header is yielded first followed by each row as a tuple, in
+            the same way as csv.reader, to avoid creating a dictionary per row.
+            """
+            report_response = await self.wait(report_id, timeout=timeout)
             download_url = report_response.get("attributes", {}).get("download-url")
             if not download_url:
                 raise APIError(
                     "No download report URL found in response. Unable to download report data.",
                     report_response,
                 )
-            async with httpx.AsyncClient() as data_client:
+            async with self.session() as data_client:
                 async with data_client.stream(
                     "GET", download_url, follow_redirects=True
                 ) as response:
                     response.raise_for_status()
-                    lines = []
-                    async for line in response.aiter_lines():
-                        lines.append(line)
-                    csv_reader = csv.reader(lines)
-                    headers = next(csv_reader)
-                    rows = []
-                    for row in csv_reader:
-                        rows.append(dict(zip(headers, row)))
-                    return rows
+                    headers = None
+                    # Rows are parsed in batches when a worker pool executor is set
+                    offload = (
+                        self.worker_pool.run if self.worker_pool.executor else None
+                    )
+                    rows = iterate_csv(response.aiter_lines(), offload=offload)
+                    async for row in rows:
+                        if headers is None:
+                            headers = tuple(row)
+                            if as_tuples:
+                                yield headers
+                        elif as_tuples:
+                            yield tuple(row)
+                        else:
+                            yield dict(zip(headers, row))
 
     async def oauth2(self, client_id: str, redirect_url: str) -> Service:
         """
@@ -0,0 +1,188 @@
+"""
+Placements.io Python SDK
+Incremental sync of services using the modified_since filter
+"""
+
+import os
+import logging
+import datetime
+import tempfile
+from pio.model.service import services
+from pio.utility.concurrency import gather_limited, call_blocking
+from pio.utility.json_codec import JSONCodec, default_codec
+
+# Services which support the modified_since filter
+SYNC_SERVICES = [service for service in services if service != "reports"]
+# Seconds subtracted from each checkpoint to absorb clock skew and late writes
+DEFAULT_OVERLAP = 300
+
+
+def atomic_write(path: str, content: bytes):
+    """
+    Writes a file so that readers see either the previous or the new content,
+    even if the process stops part way through writing
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    with tempfile.NamedTemporaryFile(dir=directory, delete=False) as file:
+        try:
+            file.write(content)
+            file.flush()
+            os.fsync(file.fileno())
+        except BaseException:
+            os.unlink(file.name)
+            raise
+    os.replace(file.name, path)
+
+
+class SyncCheckpoint:
+    """
+    High-water marks for each synced service, persisted to a JSON file
+    Note: Saving is blocking, so Sync saves checkpoints from a thread
+    """
+
+    blocking = True
+
+    def __init__(self, path: str, codec: JSONCodec = None):
+        self.path = path
+        self.codec = codec or default_codec()
+        self.checkpoints = {}
+        if os.path.exists(path):
+            with open(path, "rb") as file:
+                self.checkpoints = self.codec.loads(file.read())
+
+    def get(self, service: str) -> datetime.datetime:
+        """
+        Returns the time the service was last synced from, or None
+        """
+        checkpoint = self.checkpoints.get(service)
+        return datetime.datetime.fromisoformat(checkpoint) if checkpoint else None
+
+    def set(self, service: str, checkpoint: datetime.datetime):
+        """
+        Sets the time the service was last synced from
+        """
+        self.checkpoints[service] = checkpoint.isoformat()
+
+    def save(self):
+        """
+        Atomically writes the checkpoints to the JSON file
+        """
+        atomic_write(self.path, self.codec.dumps(self.checkpoints))
+
+
+class JSONStore:
+    """
+    Local store of synced resources keyed by service and resource id, persisted
+    to a JSON file
+
+    Stores provide `merge(service, resources)` to add or replace resources and
+    `save()` to persist them, and may be replaced by any object which does.
+    Stores which block on I/O, such as this store and a Mirror, set `blocking`
+    so that they are called from a thread rather than on the event loop.
+    """
+
+    blocking = True
+
+    def __init__(self, path: str, codec: JSONCodec = None):
+        self.path = path
+        self.codec = codec or default_codec()
+        self.data = {}
+        if os.path.exists(path):
+            with open(path, "rb") as file:
+                self.data = self.codec.loads(file.read())
+
+    def resources(self, service: str) -> list:
+        """
+        Returns the stored resources for the service
+        """
+        return list(self.data.get(service, {}).values())
+
+    def merge(self, service: str, resources: list):
+        """
+        Adds or replaces resources for the service by resource id
+        """
+        stored = self.data.setdefault(service, {})
+        for resource in resources:
+            stored[str(resource.get("id"))] = resource
+
+    def save(self):
+        """
+        Atomically writes the stored resources to the JSON file
+        """
+        atomic_write(self.path, self.codec.dumps(self.data))
+
+
+class Sync:
+    """
+    Incrementally syncs services into a local store
+
+    The first sync of a service fetches every resource. Later syncs only fetch
+    resources modified since the previous sync started, less `overlap` seconds
+    to absorb clock skew between the client and the API, and merge them into
+    the store. The store is saved before the checkpoints are advanced so that
+    changes are fetched again if a sync stops part way through.
+    Note: Deleted resources are not reported by the modified_since filter and
+    remain in the store.
+    """
+
+    def __init__(
+        self,
+        pio,
+        store,
+        checkpoint: str,
+        overlap: float = DEFAULT_OVERLAP,
+        max_concurrency: int = None,
+    ):
+        self.pio = pio
+        self.store = store
+        self.checkpoint = SyncCheckpoint(checkpoint, codec=pio.codec)
+        self.overlap = datetime.timedelta(seconds=overlap)
+        self.max_concurrency = max_concurrency or pio.settings["max_concurrency"]
+        self.logger = logging.getLogger("pio")
+
+    async def run(self, services: list = None) -> dict:
+        """
+        Syncs the services, defaulting to every service which supports the
+        modified_since filter, and returns the number of resources fetched for
+        each service
+        """
+        services = services or SYNC_SERVICES
+        results = await gather_limited(
+            (self._sync_service(service) for service in services),
+            self.max_concurrency,
+        )
+        synced = {
+            service: result
+            for service, result in zip(services, results)
+            if not isinstance(result, Exception)
+        }
+        if synced:
+            await call_blocking(self.store, "save")
+            for service, (_, started) in synced.items():
+                self.checkpoint.set(service, started)
+            await call_blocking(self.checkpoint, "save")
+        for result in results:
+            if isinstance(result, Exception):
+                raise result
+        return {service: count for service, (count, _) in synced.items()}
+
+    async def _sync_service(self, service: str):
+        """
+        Fetches the resources of a service modified since its checkpoint and
+        merges them into the store, returning the number of resources and the
+        time the sync started, or the exception raised
+        """
+        started = datetime.datetime.now(datetime.timezone.utc)
+        filters = {}
+        checkpoint = self.checkpoint.get(service)
+        if checkpoint is not None:
+            filters["modified_since"] = checkpoint - self.overlap
+        self.logger.info("Syncing %s modified since %s", service, checkpoint)
+        count = 0
+        try:
+            async for page in getattr(self.pio, service).iter_pages(**filters):
+                await call_blocking(self.store, "merge", service, page)
+                count += len(page)
+        except Exception as error:  # pylint: disable=broad-except
+            return error
+        return count, started
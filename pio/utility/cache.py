@@ -0,0 +1,267 @@
+"""
+Cache Utility
+"""
+
+import abc
+import collections
+import hashlib
+import time
+import httpx
+
+DEFAULT_CACHE_SIZE = 1000
+DEFAULT_CACHE_TTL = 300
+
+
+class Cache(abc.ABC):
+    """
+    Base class for caches of GET responses keyed by service and query parameters.
+
+    Entries expire `ttl` seconds after they are stored, or after the number of
+    seconds set for their service in `ttls`, where a TTL of 0 stores responses
+    already expired so every request for the service is revalidated. Expired
+    entries are kept for a further `max_stale` seconds so that they can be served
+    when refreshing them fails.
+
+    Responses are stored as their raw body and decoded on every hit, so results
+    returned from the cache can be modified without affecting the cache.
+
+    The ETag and Last-Modified validators of a response are stored with it so
+    that expired entries can be revalidated with a conditional request, and
+    served again when the API responds that they have not been modified.
+
+    Each entry records the resource type of its service, so writes to a service
+    also invalidate pages of the same resources fetched through relationship
+    URLs. Pages of relationship URLs, whose resource type is not known, are
+    invalidated by writes to any service, like pages with included resources.
+
+    Subclasses store entries by implementing _read, _write, _delete and _size,
+    and set `blocking` when these wait on I/O so they are not called on the
+    event loop.
+    """
+
+    blocking = False
+
+    def __init__(
+        self,
+        max_size: int = DEFAULT_CACHE_SIZE,
+        ttl: float = DEFAULT_CACHE_TTL,
+        ttls: dict = None,
+        max_stale: float = 0,
+    ):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.ttls = ttls or {}
+        self.max_stale = max_stale
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.revalidated = 0
+        self.bytes_saved = 0
+        self.evictions = 0
+
+    @property
+    def stats(self) -> dict:
+        """
+        Returns the number of entries, hits, misses, stale hits, revalidated
+        entries, bytes not downloaded due to revalidation and evictions of the cache
+        """
+        return {
+            "size": self._size(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale": self.stale,
+            "revalidated": self.revalidated,
+            "bytes_saved": self.bytes_saved,
+            "evictions": self.evictions,
+        }
+
+    def key(
+        self, service: str, param: dict, base_url: str = "", token: str = None
+    ) -> str:
+        """
+        Returns the cache key for a GET request on the service
+        Note: The key includes the base URL and a hash of the token, so caches
+        shared between environments or tenants never serve each other's entries
+        """
+        key = f"{base_url or ''}{service}?{httpx.QueryParams(sorted(param.items()))}"
+        if token:
+            key += f"#{hashlib.sha256(str(token).encode()).hexdigest()[:16]}"
+        return key
+
+    def resource_type(self, service: str) -> str:
+        """
+        Returns the resource type of a service, e.g. line-items for line_items,
+        or None for a relationship URL such as campaigns/1/line-items
+        """
+        if "/" in service:
+            return None
+        return service.replace("_", "-")
+
+    def ttl_for(self, service: str) -> float:
+        """
+        Returns the number of seconds responses from the service are cached for
+        """
+        return self.ttls.get(service, self.ttl)
+
+    def get(self, key: str) -> bytes:
+        """
+        Returns the cached response body for the key, or None when the key is not
+        cached or has expired
+        """
+        entry = self._read(key)
+        if entry is None or entry["expires"] <= self._now():
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry["content"]
+
+    def get_stale(self, key: str) -> bytes:
+        """
+        Returns the cached response body for the key if it expired less than
+        `max_stale` seconds ago, or None
+        """
+        entry = self._read(key)
+        if entry is None or entry["expires"] + self.max_stale <= self._now():
+            return None
+        self.stale += 1
+        return entry["content"]
+
+    def conditional_headers(self, key: str) -> dict:
+        """
+        Returns the If-None-Match and If-Modified-Since headers to revalidate the
+        entry for the key, or an empty dict when there is no entry to revalidate
+        """
+        entry = self._read(key)
+        if entry is None:
+            return {}
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def revalidate(self, key: str) -> bytes:
+        """
+        Renews the TTL of the entry for the key after the API responded that it
+        has not been modified and returns its response body, or None when the
+        entry is no longer cached
+        """
+        entry = self._read(key)
+        if entry is None:
+            return None
+        ttl = self.ttl_for(entry["service"])
+        self._write(key, {**entry, "expires": self._now() + ttl})
+        self.revalidated += 1
+        self.bytes_saved += len(entry["content"])
+        return entry["content"]
+
+    def set(
+        self,
+        key: str,
+        service: str,
+        content: bytes,
+        includes: bool = False,
+        validators: dict = None,
+    ):
+        """
+        Stores a response body from the service, evicting the least recently used
+        entries when the cache is full
+        Note: `includes` marks responses which contain resources from other
+        services so that they are invalidated when any service is written to.
+        `validators` holds the ETag and Last-Modified headers of the response.
+        Responses for services with a TTL of 0 are stored already expired, and
+        only when they have validators.
+        """
+        ttl = self.ttl_for(service)
+        validators = validators or {}
+        if self.max_size <= 0:
+            return
+        # Responses which are always revalidated are only useful with validators
+        if not ttl and not any(validators.values()):
+            return
+        self._write(
+            key,
+            {
+                "service": service,
+                "type": self.resource_type(service),
+                "includes": includes,
+                "content": content,
+                "expires": self._now() + ttl,
+                "etag": validators.get("etag"),
+                "last_modified": validators.get("last_modified"),
+            },
+        )
+
+    def invalidate(self, service: str = None):
+        """
+        Removes the entries for the resource type of the service, and entries
+        including resources from other services or fetched from relationship
+        URLs, or every entry when no service is provided
+        Note: Every entry is removed when the resource type of the service is not
+        known, such as when it is a relationship URL
+        """
+        self._delete(self.resource_type(service) if service else None)
+
+    def _now(self) -> float:
+        return time.monotonic()
+
+    @abc.abstractmethod
+    def _read(self, key: str) -> dict:
+        """
+        Returns the entry for the key, or None
+        """
+
+    @abc.abstractmethod
+    def _write(self, key: str, entry: dict):
+        """
+        Stores the entry for the key, evicting entries once `max_size` are stored
+        """
+
+    @abc.abstractmethod
+    def _delete(self, resource_type: str = None):
+        """
+        Removes the entries for the resource type, entries with includes and
+        entries without a resource type, or every entry when no type is provided
+        """
+
+    @abc.abstractmethod
+    def _size(self) -> int:
+        """
+        Returns the number of entries stored
+        """
+
+
+class ResponseCache(Cache):
+    """
+    In-memory cache of GET responses which evicts the least recently used entry
+    once `max_size` entries are stored
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._entries = collections.OrderedDict()
+
+    def _read(self, key: str) -> dict:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def _write(self, key: str, entry: dict):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _delete(self, resource_type: str = None):
+        if resource_type is None:
+            self._entries.clear()
+            return
+        for key, entry in list(self._entries.items()):
+            if entry["type"] in (resource_type, None) or entry["includes"]:
+                del self._entries[key]
+
+    def _size(self) -> int:
+        return len(self._entries)
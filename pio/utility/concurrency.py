@@ -0,0 +1,81 @@
+"""
+Concurrency Utility
+"""
+
+import asyncio
+import collections
+import itertools
+from typing import AsyncIterator, Awaitable, Iterable
+
+DEFAULT_MAX_CONCURRENCY = 10
+DEFAULT_WRITE_CONCURRENCY = 100
+
+
+async def gather_limited(aws: Iterable[Awaitable], limit: int = None) -> list:
+    """
+    Awaits the provided awaitables keeping at most `limit` of them in flight and
+    returns their results in input order, in the same way as asyncio.gather.
+
+    The iterable is consumed lazily, so a generator of coroutines only creates
+    each coroutine once a slot is available for it. A limit of None or 0 awaits
+    everything at once.
+    """
+    if not limit:
+        return list(await asyncio.gather(*aws))
+
+    indexed = enumerate(aws)
+    pending = {}
+    results = {}
+
+    def schedule():
+        for index, awaitable in itertools.islice(indexed, limit - len(pending)):
+            pending[asyncio.ensure_future(awaitable)] = index
+
+    try:
+        schedule()
+        while pending:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                results[pending.pop(task)] = task.result()
+            schedule()
+    finally:
+        for task in pending:
+            task.cancel()
+    return [results[index] for index in range(len(results))]
+
+
+async def iterate_limited(aws: Iterable[Awaitable], limit: int = None) -> AsyncIterator:
+    """
+    Yields the results of the provided awaitables in input order as soon as each
+    one is available, reading ahead by at most `limit` awaitables which have not
+    yet been consumed. Outstanding work is cancelled if iteration stops early.
+    """
+    iterator = iter(aws)
+    window = collections.deque()
+    try:
+        window.extend(
+            asyncio.ensure_future(awaitable)
+            for awaitable in itertools.islice(iterator, limit or None)
+        )
+        while window:
+            result = await window.popleft()
+            window.extend(
+                asyncio.ensure_future(awaitable)
+                for awaitable in itertools.islice(iterator, 1)
+            )
+            yield result
+    finally:
+        for task in window:
+            task.cancel()
+
+
+async def call_blocking(obj, method: str, *args):
+    """
+    Calls a method of an object such as a cache or a store, in a thread when the
+    object sets `blocking` because it waits on I/O, so that the event loop is not
+    blocked
+    """
+    function = getattr(obj, method)
+    if getattr(obj, "blocking", False):
+        return await asyncio.to_thread(function, *args)
+    return function(*args)
@@ -0,0 +1,81 @@
+"""
+Shared HTTP connection pool utility
+"""
+
+import asyncio
+import httpx
+
+DEFAULT_TIMEOUT = 60
+DEFAULT_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20)
+
+
+class ConnectionPool:
+    """
+    Owns a single long-lived httpx.AsyncClient which is shared by every service
+    created from a PlacementsIO instance so keep-alive connections are reused
+    rather than paying a new TCP+TLS handshake for each operation.
+    """
+
+    def __init__(
+        self,
+        base_url: str = None,
+        limits: httpx.Limits = None,
+        timeout: float = DEFAULT_TIMEOUT,
+    ):
+        self.base_url = base_url
+        self.limits = limits or DEFAULT_LIMITS
+        self.timeout = timeout
+        self._client = None
+        self._loop = None
+        self._closing = set()
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """
+        Returns the pooled client, creating it on first use.
+        Note: Connections are bound to the event loop that opened them, so a new
+        client is created if the pool is used from a different event loop and
+        the previous client is closed.
+        """
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed or self._loop is not loop:
+            self._discard(self._client, self._loop)
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url or "",
+                limits=self.limits,
+                timeout=self.timeout,
+            )
+            self._loop = loop
+        return self._client
+
+    def _discard(self, client: httpx.AsyncClient, loop: asyncio.AbstractEventLoop):
+        """
+        Closes a client opened on another event loop, on that loop when it is
+        still running and otherwise on the current loop
+        """
+        if client is None or client.is_closed:
+            return
+        if loop is not None and loop.is_running():
+            asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+            return
+        task = asyncio.get_running_loop().create_task(self._close_quietly(client))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    async def _close_quietly(self, client: httpx.AsyncClient):
+        """
+        Closes a client whose event loop has stopped
+        """
+        try:
+            await client.aclose()
+        except (RuntimeError, OSError):
+            # Connections bound to a closed event loop may not shut down cleanly
+            pass
+
+    async def aclose(self):
+        """
+        Closes the pooled client and any open connections
+        """
+        client, self._client, self._loop = self._client, None, None
+        if client is not None and not client.is_closed:
+            await client.aclose()
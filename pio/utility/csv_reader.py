@@ -0,0 +1,104 @@
+"""
+CSV Reader Utility
+"""
+
+import csv
+import collections
+from typing import AsyncIterator, Awaitable, Callable
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+async def iterate_csv(
+    lines: AsyncIterator[str],
+    offload: Callable[..., Awaitable] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> AsyncIterator[list]:
+    """
+    Parses CSV rows incrementally from an asynchronous iterator of lines, such as
+    httpx.Response.aiter_lines, yielding each row as soon as it is complete.
+
+    Lines are grouped while a quoted value is still open so that quoted values
+    which span several lines are passed to the CSV reader as a single record.
+
+    When `offload` is provided, such as WorkerPool.run, records are parsed by it
+    in batches of `batch_size` rather than one at a time on the event loop.
+    """
+    if offload is not None:
+        batch = []
+        async for record in _records(lines):
+            batch.append(record)
+            if len(batch) >= batch_size:
+                for row in await offload(parse_records, batch):
+                    yield row
+                batch = []
+        if batch:
+            for row in await offload(parse_records, batch):
+                yield row
+        return
+
+    records = collections.deque()
+    reader = csv.reader(_drain(records))
+    async for record in _records(lines):
+        records.append(record)
+        yield next(reader)
+
+
+def parse_records(records: list) -> list:
+    """
+    Parses a batch of complete CSV records into rows
+    Note: This is a module level function so that it can be run by process workers
+    """
+    return list(csv.reader(records))
+
+
+async def _records(lines: AsyncIterator[str]) -> AsyncIterator[str]:
+    """
+    Groups lines into complete CSV records, continuing a record onto the next
+    line only while a quoted value is open
+    """
+    pending = []
+    quoted = False
+    async for line in lines:
+        line = line.rstrip("\r\n")
+        pending.append(line)
+        if quoted or '"' in line:
+            quoted = _quoted_at_end(line, quoted)
+            if quoted:
+                continue
+        yield "\n".join(pending)
+        pending.clear()
+    if pending:
+        yield "\n".join(pending)
+
+
+def _quoted_at_end(line: str, quoted: bool) -> bool:
+    """
+    Returns whether a quoted value is still open at the end of a line, following
+    the rules of the csv module: a quote only opens a quoted value when it is the
+    first character of a field, and is otherwise a literal character
+    Note: `quoted` is set when the line continues a quoted value
+    """
+    field_start = not quoted
+    closing = False
+    for char in line:
+        if quoted:
+            quoted = char != '"'
+            closing = not quoted
+        elif closing and char == '"':
+            # A doubled quote within a quoted value is an escaped quote
+            quoted = True
+            closing = False
+        else:
+            quoted = char == '"' and field_start
+            closing = False
+        field_start = char == "," and not quoted
+    return quoted
+
+
+def _drain(records: collections.deque):
+    """
+    Yields records from the queue for as long as the CSV reader requests them
+    """
+    while records:
+        yield records.popleft()
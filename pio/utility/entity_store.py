@@ -0,0 +1,124 @@
+"""
+Entity Store Utility
+"""
+
+import weakref
+from pio.model.response import LazyRelationship
+
+
+class Entity(dict):
+    """
+    Resource held by an entity store
+    Note: Plain dicts cannot be weakly referenced, so stored resources are
+    wrapped in this subclass
+    """
+
+
+class EntityStore:
+    """
+    Identity map of resources keyed by (type, id) shared between responses.
+
+    Each resource is held once. When a later response returns a resource which
+    is already stored, the stored resource is updated in place, merging its
+    attributes and relationships, so every response referencing it sees the
+    latest values. Relationships of resources merged with `merge_all` are
+    linked to the stored resources they refer to, and otherwise resolve to the
+    stored resources when they are first accessed.
+
+    Resources are only held while a response or a linked relationship refers
+    to them, so the store does not grow for the lifetime of a long running
+    process.
+
+    Note: Stored resources are shared rather than copied, so modifying a
+    resource modifies it in every response, and resources which refer to each
+    other contain circular references.
+    """
+
+    def __init__(self):
+        self.entities = weakref.WeakValueDictionary()
+        self.updates = 0
+
+    @property
+    def stats(self) -> dict:
+        """
+        Returns the number of resources stored and resources updated in place
+        """
+        return {"size": len(self.entities), "updates": self.updates}
+
+    def get(self, resource_type: str, resource_id) -> dict:
+        """
+        Returns the stored resource for a type and id, or None
+        """
+        return self.entities.get((resource_type, str(resource_id)))
+
+    def resolve(self, identifier: dict) -> dict:
+        """
+        Returns the stored resource for a resource identifier, or the resource
+        identifier itself when the resource is not stored
+        """
+        resource = self.get(identifier.get("type"), identifier.get("id"))
+        return identifier if resource is None else resource
+
+    def merge(self, resource: dict) -> dict:
+        """
+        Adds a resource to the store, or updates the stored resource in place,
+        and returns the stored resource
+        Note: Attributes and relationships missing from the resource, such as
+        those left out by sparse fieldsets, keep their stored values
+        """
+        if not isinstance(resource, dict) or "type" not in resource:
+            return resource
+        key = (resource["type"], str(resource.get("id")))
+        entity = self.entities.get(key)
+        if entity is None:
+            entity = Entity(resource)
+            entity["attributes"] = dict(resource.get("attributes") or {})
+            entity.pop("relationships", None)
+            self.entities[key] = entity
+        else:
+            self.updates += 1
+            for name, value in resource.items():
+                if name not in ("attributes", "relationships"):
+                    entity[name] = value
+            entity.setdefault("attributes", {}).update(resource.get("attributes") or {})
+        relationships = resource.get("relationships")
+        if isinstance(relationships, dict):
+            stored = entity.setdefault("relationships", {})
+            for name, relationship in relationships.items():
+                stored[name] = (
+                    LazyRelationship(relationship, self)
+                    if isinstance(relationship, dict)
+                    else relationship
+                )
+        return entity
+
+    def merge_all(self, resources: list) -> list:
+        """
+        Adds or updates several resources, such as the data and included
+        resources of a response, and returns the stored resources
+        Note: Relationships are linked once every resource has been merged, so
+        related resources are kept for as long as the resources referring to
+        them rather than only while the response which included them is held
+        """
+        entities = [self.merge(resource) for resource in resources]
+        for entity in entities:
+            self.link(entity)
+        return entities
+
+    def link(self, entity: dict):
+        """
+        Resolves the relationships of a stored resource to the stored resources
+        they refer to
+        """
+        relationships = (
+            entity.get("relationships") if isinstance(entity, dict) else None
+        )
+        for relationship in (relationships or {}).values():
+            if isinstance(relationship, LazyRelationship):
+                relationship.get("data")
+
+    def clear(self):
+        """
+        Removes every resource from the store
+        """
+        self.entities.clear()
@@ -0,0 +1,94 @@
+"""
+JSON Codec Utility
+"""
+
+import json
+from pio.utility.json_encoder import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+class JSONCodec:
+    """
+    Encodes request bodies and decodes response bodies using the standard library.
+
+    Bodies are encoded to and decoded from bytes so responses can be decoded
+    straight from httpx.Response.content. Objects such as datetime, date and
+    Decimal are handled in the same way as JSONEncoder, and any other object is
+    converted to a string.
+    """
+
+    name = "json"
+
+    def __init__(self):
+        self._encoder = JSONEncoder()
+
+    def default(self, o):
+        """
+        Returns a JSON serializable version of an object
+        """
+        try:
+            return self._encoder.default(o)
+        except TypeError:
+            return str(o)
+
+    def dumps(self, obj) -> bytes:
+        """
+        Encodes an object to JSON bytes
+        """
+        return json.dumps(obj, default=self.default, separators=(",", ":")).encode()
+
+    def loads(self, data: bytes):
+        """
+        Decodes JSON bytes or text
+        """
+        return json.loads(data)
+
+
+class OrjsonCodec(JSONCodec):
+    """
+    Encodes and decodes JSON using orjson when it is installed.
+    Note: orjson serializes datetime and date objects natively as RFC 3339 strings,
+    which matches their isoformat. Objects orjson cannot encode, such as integers
+    larger than 64 bits, are encoded with the standard library instead.
+    """
+
+    name = "orjson"
+
+    def default(self, o):
+        """
+        Returns a JSON serializable version of an object
+        Note: dict and list subclasses, such as lazy relationships, are passed
+        here so they are read through their own methods rather than their
+        internal storage
+        """
+        if isinstance(o, dict):
+            return dict(o.items())
+        if isinstance(o, list):
+            return list(o)
+        return super().default(o)
+
+    def dumps(self, obj) -> bytes:
+        try:
+            return orjson.dumps(
+                obj,
+                default=self.default,
+                option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_SUBCLASS,
+            )
+        except TypeError:
+            return super().dumps(obj)
+
+    def loads(self, data: bytes):
+        return orjson.loads(data)
+
+
+def default_codec() -> JSONCodec:
+    """
+    Returns the fastest JSON codec available
+    """
+    if orjson is not None:
+        return OrjsonCodec()
+    return JSONCodec()
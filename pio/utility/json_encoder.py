@@ -4,6 +4,7 @@ JSON Encoder Utility
 
 import json
 import datetime
+import decimal
 
 
 class JSONEncoder(json.JSONEncoder):
@@ -12,6 +13,8 @@ class JSONEncoder(json.JSONEncoder):
     """
 
     def default(self, o):
-        if isinstance(o, datetime.datetime):
+        if isinstance(o, (datetime.datetime, datetime.date)):
             return o.isoformat()
+        if isinstance(o, decimal.Decimal):
+            return str(o)
         return super().default(o)  # pragma: no cover
@@ -0,0 +1,66 @@
+"""
+Page Size Utility
+"""
+
+DEFAULT_PAGE_SIZE = 100
+MIN_PAGE_SIZE = 10
+# The largest page size accepted by the API
+MAX_PAGE_SIZE = 1000
+TARGET_PAGE_LATENCY = 2.0
+TARGET_PAGE_BYTES = 5 * 1024 * 1024
+
+
+class PageSizeTuner:
+    """
+    Chooses the page size for each service from the latency and payload size of
+    the pages previously downloaded from it.
+
+    A full page which took less than half the target latency and bytes doubles
+    the page size of the next request, while a page which exceeded either target
+    halves it. Pages requested at any other size than the current size for the
+    service are ignored, such as requests with a fixed page size or the remaining
+    pages of a request once the size has been adjusted.
+    """
+
+    def __init__(
+        self,
+        initial: int = DEFAULT_PAGE_SIZE,
+        min_size: int = MIN_PAGE_SIZE,
+        max_size: int = MAX_PAGE_SIZE,
+        target_latency: float = TARGET_PAGE_LATENCY,
+        target_bytes: int = TARGET_PAGE_BYTES,
+    ):
+        self.initial = initial
+        self.min_size = min_size
+        self.max_size = max_size
+        self.target_latency = target_latency
+        self.target_bytes = target_bytes
+        self.sizes = {}
+
+    def size(self, service: str) -> int:
+        """
+        Returns the page size to request from the service
+        """
+        return self.sizes.get(service, self.initial)
+
+    def observe(
+        self,
+        service: str,
+        page_size: int,
+        records: int,
+        latency: float,
+        size_bytes: int,
+    ):
+        """
+        Records a downloaded page and adjusts the page size for the service
+        """
+        if page_size != self.size(service):
+            return
+        if latency > self.target_latency or size_bytes > self.target_bytes:
+            self.sizes[service] = max(self.min_size, page_size // 2)
+        elif (
+            records >= page_size
+            and latency < self.target_latency / 2
+            and size_bytes < self.target_bytes / 2
+        ):
+            self.sizes[service] = min(self.max_size, page_size * 2)
@@ -0,0 +1,158 @@
+"""
+Rate Limiter Utility
+"""
+
+import asyncio
+import collections
+import time
+
+DEFAULT_MAX_IN_FLIGHT = 100
+
+
+class RateLimiter:
+    """
+    Adaptive rate limiter shared by every request made from a PlacementsIO instance.
+
+    Requests are admitted while the number in flight is below an additive-increase /
+    multiplicative-decrease (AIMD) limit and, when a rate is provided, a token is
+    available in a token bucket refilled at that many requests per second.
+
+    A 429 response pauses the whole pool once for the Retry-After period and cuts
+    the in flight limit (and rate) by `decrease`. Each successful response then
+    ramps the limits back up towards their configured maximums.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+        min_in_flight: int = 1,
+        rate: float = None,
+        burst: int = None,
+        increase: float = 1.0,
+        decrease: float = 0.5,
+    ):
+        self.max_in_flight = max_in_flight
+        self.min_in_flight = min_in_flight
+        self.max_rate = rate
+        self.burst = burst or max(1, int(rate or 1))
+        self.increase = increase
+        self.decrease = decrease
+        self.in_flight_limit = float(max_in_flight)
+        self.rate = rate
+        self.in_flight = 0
+        self.throttled = 0
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._waiters = collections.deque()
+
+    @property
+    def backoff(self) -> float:
+        """
+        Returns the number of seconds remaining before paused requests resume
+        """
+        return max(0.0, self._paused_until - time.monotonic())
+
+    @property
+    def state(self) -> dict:
+        """
+        Returns the current limits and backoff state of the rate limiter
+        """
+        return {
+            "in_flight": self.in_flight,
+            "in_flight_limit": int(self.in_flight_limit),
+            "rate": self.rate,
+            "backoff": self.backoff,
+            "throttled": self.throttled,
+        }
+
+    async def acquire(self):
+        """
+        Waits until the pool is not paused, a request slot is free and, when
+        rate limited, a token is available
+        """
+        while True:
+            delay = self.backoff
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+            if self.in_flight >= int(self.in_flight_limit):
+                waiter = asyncio.get_running_loop().create_future()
+                self._waiters.append(waiter)
+                try:
+                    await waiter
+                except asyncio.CancelledError:
+                    if waiter in self._waiters:
+                        self._waiters.remove(waiter)
+                    elif not waiter.cancelled():
+                        # Pass on a wake up which arrived as this request was cancelled
+                        self._wake()
+                    raise
+                continue
+            delay = self._take_token()
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+            self.in_flight += 1
+            return
+
+    def release(self):
+        """
+        Frees the request slot taken by acquire
+        """
+        self.in_flight -= 1
+        self._wake()
+
+    def record_success(self):
+        """
+        Additively increases the limits after a successful response
+        """
+        self.in_flight_limit = min(
+            self.max_in_flight,
+            self.in_flight_limit + self.increase / self.in_flight_limit,
+        )
+        if self.rate:
+            self.rate = min(self.max_rate, self.rate + self.increase / self.rate)
+        self._wake()
+
+    def record_throttle(self, retry_after: float):
+        """
+        Pauses every request for `retry_after` seconds and multiplicatively
+        decreases the limits. Throttled responses which arrive while the pool is
+        already paused only extend the pause.
+        """
+        self.throttled += 1
+        now = time.monotonic()
+        if now >= self._paused_until:
+            self.in_flight_limit = max(
+                self.min_in_flight, self.in_flight_limit * self.decrease
+            )
+            if self.rate:
+                self.rate = self.rate * self.decrease
+                self._tokens = 0.0
+        self._paused_until = max(self._paused_until, now + retry_after)
+
+    def _take_token(self) -> float:
+        """
+        Takes a token from the bucket, returning the seconds to wait if empty
+        """
+        if not self.rate:
+            return 0.0
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+        return (1 - self._tokens) / self.rate
+
+    def _wake(self):
+        """
+        Wakes as many waiting requests as there are free request slots
+        """
+        free = int(self.in_flight_limit) - self.in_flight
+        while free > 0 and self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                free -= 1
@@ -0,0 +1,59 @@
+"""
+Single Flight Utility
+"""
+
+import asyncio
+from typing import Awaitable, Callable
+import httpx
+
+
+class SingleFlight:
+    """
+    De-duplicates identical requests which are in flight at the same time.
+
+    The first caller for a key sends the request and every caller which asks for
+    the same key before it completes waits for, and shares, its result or error.
+    Requests are only shared while in flight, so a later call for the same key
+    sends a new request.
+
+    Note: A caller which is cancelled stops waiting without cancelling the
+    request for the other callers sharing it.
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.coalesced = 0
+        self._in_flight = {}
+
+    @property
+    def stats(self) -> dict:
+        """
+        Returns the number of requests sent, requests saved by sharing an
+        identical request and requests currently in flight
+        """
+        return {
+            "requests": self.requests,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._in_flight),
+        }
+
+    def key(self, method: str, path: str, param: dict) -> str:
+        """
+        Returns the key identifying a request by its method, path and parameters
+        """
+        return f"{method} {path}?{httpx.QueryParams(sorted(param.items()))}"
+
+    async def run(self, key: str, request: Callable[[], Awaitable]):
+        """
+        Awaits `request()` unless a request for the key is already in flight, in
+        which case its result is shared
+        """
+        task = self._in_flight.get(key)
+        if task is None:
+            self.requests += 1
+            task = asyncio.ensure_future(request())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
@@ -0,0 +1,176 @@
+"""
+SQLite Cache Utility
+"""
+
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from pio.utility.cache import Cache
+
+SQLITE_TIMEOUT = 30
+# Databases created with another schema version are recreated when opened
+SCHEMA_VERSION = 3
+SCHEMA = [
+    "DROP TABLE IF EXISTS responses",
+    """
+    CREATE TABLE IF NOT EXISTS responses (
+        key TEXT PRIMARY KEY,
+        service TEXT NOT NULL,
+        type TEXT,
+        includes INTEGER NOT NULL,
+        content BLOB NOT NULL,
+        expires REAL NOT NULL,
+        accessed REAL NOT NULL,
+        etag TEXT,
+        last_modified TEXT
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS responses_type ON responses (type)",
+    "CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)",
+    f"PRAGMA user_version = {SCHEMA_VERSION}",
+]
+
+
+class SQLiteCache(Cache):
+    """
+    Persistent cache of GET responses stored in a SQLite database, so cached
+    responses survive process restarts and are shared between processes.
+
+    Response bodies are compressed with zlib. The database uses write-ahead
+    logging, so reads do not wait for writes, and each thread opens its own
+    connection, waiting up to SQLITE_TIMEOUT seconds for other processes to
+    finish writing. Reads never write to the database. Once `max_size` entries
+    are stored the entries least recently stored or revalidated are evicted.
+    Note: The cache is blocking, so requests call it from a thread rather than
+    on the event loop.
+    """
+
+    blocking = True
+
+    def __init__(self, path: str, *args, compression: int = 6, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.path = path
+        self.compression = compression
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._connections = []
+        self._pid = os.getpid()
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """
+        Returns the connection for the current thread, creating the database
+        schema the first time it is opened
+        Note: Connections are not shared with forked worker processes
+        """
+        if self._pid != os.getpid():
+            self._lock = threading.Lock()
+            self._local = threading.local()
+            self._connections = []
+            self._pid = os.getpid()
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(
+                self.path,
+                timeout=SQLITE_TIMEOUT,
+                isolation_level=None,
+                check_same_thread=False,
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            with connection:
+                connection.execute("BEGIN IMMEDIATE")
+                version = connection.execute("PRAGMA user_version").fetchone()[0]
+                if version != SCHEMA_VERSION:
+                    for statement in SCHEMA:
+                        connection.execute(statement)
+            self._local.connection = connection
+            with self._lock:
+                self._connections.append(connection)
+        return connection
+
+    def close(self):
+        """
+        Closes the connections of every thread in the current process
+        """
+        if self._pid == os.getpid():
+            with self._lock:
+                for connection in self._connections:
+                    connection.close()
+        self._local = threading.local()
+        self._connections = []
+
+    def _now(self) -> float:
+        # Wall clock time is used as entries are shared between processes
+        return time.time()
+
+    def _read(self, key: str) -> dict:
+        row = self.connection.execute(
+            """
+            SELECT service, type, includes, content, expires, etag, last_modified
+            FROM responses WHERE key = ?
+            """,
+            (key,),
+        ).fetchone()
+        if row is None:
+            return None
+        service, resource_type, includes, content, expires, etag, last_modified = row
+        return {
+            "service": service,
+            "type": resource_type,
+            "includes": bool(includes),
+            "content": zlib.decompress(content),
+            "expires": expires,
+            "etag": etag,
+            "last_modified": last_modified,
+        }
+
+    def _write(self, key: str, entry: dict):
+        now = self._now()
+        with self.connection:
+            self.connection.execute("BEGIN IMMEDIATE")
+            self.connection.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    entry["service"],
+                    entry["type"],
+                    int(entry["includes"]),
+                    zlib.compress(entry["content"], self.compression),
+                    entry["expires"],
+                    now,
+                    entry.get("etag"),
+                    entry.get("last_modified"),
+                ),
+            )
+            # Entries which can no longer be served, even when stale, are removed
+            # unless they can be revalidated
+            self.connection.execute(
+                """
+                DELETE FROM responses WHERE expires + ? <= ?
+                AND etag IS NULL AND last_modified IS NULL
+                """,
+                (self.max_stale, now),
+            )
+            evicted = self.connection.execute(
+                """
+                DELETE FROM responses WHERE key IN (
+                    SELECT key FROM responses ORDER BY accessed DESC LIMIT -1 OFFSET ?
+                )
+                """,
+                (self.max_size,),
+            )
+            self.evictions += evicted.rowcount
+
+    def _delete(self, resource_type: str = None):
+        if resource_type is None:
+            self.connection.execute("DELETE FROM responses")
+            return
+        self.connection.execute(
+            "DELETE FROM responses WHERE type = ? OR type IS NULL OR includes",
+            (resource_type,),
+        )
+
+    def _size(self) -> int:
+        return self.connection.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
@@ -0,0 +1,55 @@
+"""
+Worker Pool Utility
+"""
+
+import asyncio
+import functools
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Union
+
+EXECUTORS = {
+    "thread": ThreadPoolExecutor,
+    "process": ProcessPoolExecutor,
+}
+
+
+class WorkerPool:
+    """
+    Runs CPU heavy work such as decoding pages, merging included resources and
+    parsing CSV reports away from the event loop so that network I/O for other
+    requests continues while it runs.
+
+    The executor may be "thread", "process" or an existing Executor. Thread
+    workers hand results back without copying them, while process workers run in
+    parallel on multi-core hosts at the cost of pickling arguments and results.
+    Without an executor work is run inline on the event loop.
+    """
+
+    def __init__(self, executor: Union[str, Executor] = None, workers: int = None):
+        self._owned = isinstance(executor, str)
+        if self._owned:
+            if executor not in EXECUTORS:
+                raise ValueError(
+                    f"Executor must be one of {list(EXECUTORS)} or an Executor instance."
+                )
+            executor = EXECUTORS[executor](max_workers=workers)
+        self.executor = executor
+
+    async def run(self, func, *args, **kwargs):
+        """
+        Runs a function in the executor, or inline when there is no executor
+        Note: Functions run by process workers must be importable module level
+        functions and their arguments must be picklable.
+        """
+        if self.executor is None:
+            return func(*args, **kwargs)
+        return await asyncio.get_running_loop().run_in_executor(
+            self.executor, functools.partial(func, *args, **kwargs)
+        )
+
+    def shutdown(self):
+        """
+        Shuts down the executor if it was created by the worker pool
+        """
+        if self._owned:
+            self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,123 @@
+"""
+Tests for the response cache utility
+"""
+
+from unittest.mock import patch
+import pytest
+from pio.utility.cache import Cache, ResponseCache
+
+
+def test_cache_hit_and_miss():
+    """Test that stored responses are returned and counted"""
+    cache = ResponseCache()
+    key = cache.key("accounts", {"page[size]": 100, "filter[name]": "A"})
+    assert key == cache.key("accounts", {"filter[name]": "A", "page[size]": 100})
+    assert cache.get(key) is None
+    cache.set(key, "accounts", b"{}")
+    assert cache.get(key) == b"{}"
+    assert cache.stats == {
+        "size": 1,
+        "hits": 1,
+        "misses": 1,
+        "stale": 0,
+        "revalidated": 0,
+        "bytes_saved": 0,
+        "evictions": 0,
+    }
+
+
+def test_cache_ttl_per_service():
+    """Test that entries expire after the TTL for their service"""
+    cache = ResponseCache(ttl=10, ttls={"products": 100, "users": 0})
+    with patch("pio.utility.cache.time.monotonic", return_value=0):
+        cache.set("accounts", "accounts", b"a")
+        cache.set("products", "products", b"p")
+        cache.set("users", "users", b"u")
+    with patch("pio.utility.cache.time.monotonic", return_value=50):
+        assert cache.get("accounts") is None
+        assert cache.get("products") == b"p"
+        assert cache.get("users") is None
+    assert cache.stats["size"] == 2
+
+
+def test_cache_lru_eviction():
+    """Test that the least recently used entry is evicted when full"""
+    cache = ResponseCache(max_size=2)
+    cache.set("a", "accounts", b"a")
+    cache.set("b", "accounts", b"b")
+    cache.get("a")
+    cache.set("c", "accounts", b"c")
+    assert cache.get("b") is None
+    assert cache.get("a") == b"a"
+    assert cache.get("c") == b"c"
+    assert cache.evictions == 1
+
+
+def test_cache_invalidate():
+    """Test that invalidation removes the service and entries with includes"""
+    cache = ResponseCache()
+    cache.set("accounts", "accounts", b"a")
+    cache.set("campaigns", "campaigns", b"c")
+    cache.set("line_items", "line_items", b"l", includes=True)
+    cache.invalidate("accounts")
+    assert cache.stats["size"] == 1
+    assert cache.get("campaigns") == b"c"
+    cache.invalidate()
+    assert cache.stats["size"] == 0
+
+
+def test_cache_invalidate_by_resource_type():
+    """Test that invalidation matches resource types and relationship URLs"""
+    cache = ResponseCache()
+    cache.set("line_items", "line_items", b"l")
+    cache.set("accounts", "accounts", b"a")
+    cache.set("campaigns/1/line-items", "campaigns/1/line-items", b"r")
+    cache.invalidate("line-items")
+    assert cache.get("accounts") == b"a"
+    assert cache.stats["size"] == 1
+
+
+def test_cache_requires_storage_hooks():
+    """Test that caches must implement the storage hooks"""
+    with pytest.raises(TypeError):
+        Cache()  # pylint: disable=abstract-class-instantiated
+
+
+def test_cache_stale_entries():
+    """Test that expired entries are only served as stale within max_stale"""
+    cache = ResponseCache(ttl=10, max_stale=20)
+    with patch("pio.utility.cache.time.monotonic", return_value=0):
+        cache.set("accounts", "accounts", b"a")
+        assert cache.get_stale("accounts") == b"a"
+    with patch("pio.utility.cache.time.monotonic", return_value=15):
+        assert cache.get("accounts") is None
+        assert cache.get_stale("accounts") == b"a"
+    with patch("pio.utility.cache.time.monotonic", return_value=30):
+        assert cache.get_stale("accounts") is None
+    assert cache.stale == 2
+
+
+def test_cache_revalidate():
+    """Test that expired entries are revalidated with their validators"""
+    cache = ResponseCache(ttl=10)
+    with patch("pio.utility.cache.time.monotonic", return_value=0):
+        cache.set("plain", "accounts", b"p")
+        cache.set(
+            "accounts",
+            "accounts",
+            b"abc",
+            validators={"etag": '"v1"', "last_modified": "Mon, 01 Jan 2024"},
+        )
+    assert cache.conditional_headers("plain") == {}
+    assert cache.conditional_headers("missing") == {}
+    assert cache.conditional_headers("accounts") == {
+        "If-None-Match": '"v1"',
+        "If-Modified-Since": "Mon, 01 Jan 2024",
+    }
+    with patch("pio.utility.cache.time.monotonic", return_value=100):
+        assert cache.get("accounts") is None
+        assert cache.revalidate("accounts") == b"abc"
+        assert cache.get("accounts") == b"abc"
+    assert cache.revalidate("missing") is None
+    assert cache.stats["revalidated"] == 1
+    assert cache.stats["bytes_saved"] == 3
@@ -2,6 +2,7 @@
 Tests for PlacementsIOClient helper methods
 """
 
+import httpx
 from pio.client import PlacementsIOClient
 
 
@@ -235,3 +236,31 @@ def test_merge_includes_nested_deduplication():
 
     # Should only have "campaign" once
     assert result.count("campaign") == 1
+
+
+# ============================================================================
+# Tests for _id_batches
+# ============================================================================
+
+
+def test_id_batches_page_size():
+    """Test that ID batches do not exceed a single page of results"""
+    client = PlacementsIOClient()
+    batches = client._id_batches("accounts", [str(_) for _ in range(250)], {})
+    assert [len(batch) for batch in batches] == [100, 100, 50]
+
+
+def test_id_batches_url_length():
+    """Test that ID batches keep the URL under the maximum length"""
+    client = PlacementsIOClient(max_url_length=100)
+    client.base_url = "https://api-staging.placements.io/v1/"
+    resource_ids = [str(100000 + _) for _ in range(20)]
+    batches = client._id_batches("accounts", resource_ids, {"page[size]": 100})
+    assert len(batches) > 1
+    assert sum(batches, []) == resource_ids
+    for batch in batches:
+        url = httpx.URL(
+            f"{client.base_url}accounts",
+            params={"page[size]": 100, "filter[id]": ",".join(batch)},
+        )
+        assert len(str(url)) <= 100
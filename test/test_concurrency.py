@@ -0,0 +1,85 @@
+"""
+Tests for the concurrency utility
+"""
+
+import asyncio
+import threading
+import pytest
+from pio.utility.concurrency import call_blocking, gather_limited, iterate_limited
+
+
+@pytest.mark.asyncio
+async def test_gather_limited_order_and_limit():
+    """Test that results keep input order and in-flight work is bounded"""
+    in_flight = 0
+    peak = 0
+
+    async def work(value):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.001 * (10 - value))
+        in_flight -= 1
+        return value
+
+    results = await gather_limited((work(value) for value in range(10)), 3)
+    assert results == list(range(10))
+    assert peak == 3
+
+
+@pytest.mark.asyncio
+async def test_gather_limited_unbounded():
+    """Test that no limit behaves like asyncio.gather"""
+
+    async def work(value):
+        return value * 2
+
+    assert await gather_limited([work(1), work(2)]) == [2, 4]
+
+
+@pytest.mark.asyncio
+async def test_gather_limited_raises():
+    """Test that exceptions are raised to the caller"""
+
+    async def work(value):
+        if value == 2:
+            raise ValueError(value)
+        return value
+
+    with pytest.raises(ValueError):
+        await gather_limited((work(value) for value in range(5)), 2)
+
+
+@pytest.mark.asyncio
+async def test_iterate_limited_read_ahead():
+    """Test that results are yielded in order with bounded read ahead"""
+    started = []
+
+    async def work(value):
+        started.append(value)
+        await asyncio.sleep(0.001 * (5 - value))
+        return value
+
+    results = iterate_limited((work(value) for value in range(5)), 2)
+    assert await results.__anext__() == 0
+    assert len(started) <= 3
+    assert [value async for value in results] == [1, 2, 3, 4]
+
+
+@pytest.mark.asyncio
+async def test_call_blocking_in_thread():
+    """Test that only objects which set blocking are called from a thread"""
+
+    class Store:
+        """Records the thread each call is made from"""
+
+        blocking = False
+
+        def save(self, value):
+            return value, threading.get_ident()
+
+    store = Store()
+    assert await call_blocking(store, "save", 1) == (1, threading.get_ident())
+    store.blocking = True
+    value, thread = await call_blocking(store, "save", 2)
+    assert value == 2 and thread != threading.get_ident()
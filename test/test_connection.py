@@ -0,0 +1,90 @@
+"""
+Tests for the shared connection pool of the PlacementsIO class
+"""
+
+import re
+import asyncio
+import pytest
+import httpx
+from pytest_httpx import HTTPXMock
+from pio import PlacementsIO, PlacementsIO_OAuth
+
+URL_REGEX = r"https://api-staging\.placements\.io/v1/(\w+)(\?.*)?"
+
+
+@pytest.fixture()
+def mock_get_empty(httpx_mock: HTTPXMock):
+    """
+    Mocks a successful GET request with no results
+    """
+    httpx_mock.add_response(
+        method="GET",
+        url=re.compile(URL_REGEX),
+        json={"data": [], "meta": {}},
+    )
+
+
+def test_services_share_connection_pool():
+    """Test that every service uses the connection pool of its PlacementsIO"""
+    pio = PlacementsIO(environment="staging", token="foo")
+    assert pio.accounts.connection is pio.connection
+    assert pio.reports.connection is pio.connection
+    relationship = pio.relationship(f"{pio.base_url}campaigns/1/line_items")
+    assert relationship.connection is pio.connection
+    assert relationship.service == "campaigns/1/line_items"
+
+
+def test_connection_pool_limits():
+    """Test that custom httpx.Limits are passed to the pooled client"""
+    limits = httpx.Limits(max_connections=5, max_keepalive_connections=2)
+    pio = PlacementsIO(environment="staging", token="foo", limits=limits)
+    assert pio.connection.limits is limits
+
+
+@pytest.mark.httpx_mock(can_send_already_matched_responses=True)
+@pytest.mark.asyncio
+async def test_connection_pool_reused_across_requests(mock_get_empty):
+    """Test that separate calls reuse the same pooled client"""
+    pio = PlacementsIO(environment="staging", token="foo")
+    await pio.accounts.get()
+    client = pio.connection.client
+    await pio.campaigns.get()
+    assert pio.connection.client is client
+    assert not client.is_closed
+    await pio.aclose()
+    assert client.is_closed
+
+
+@pytest.mark.asyncio
+async def test_connection_pool_context_manager(mock_get_empty):
+    """Test that the pool is closed when leaving the async context"""
+    async with PlacementsIO(environment="staging", token="foo") as pio:
+        await pio.accounts.get()
+        client = pio.connection.client
+    assert client.is_closed
+
+
+def test_connection_pool_closes_client_from_previous_loop():
+    """Test that the client of a previous event loop is closed when replaced"""
+    pio = PlacementsIO(environment="staging", token="foo")
+
+    async def use_client():
+        client = pio.connection.client
+        await asyncio.sleep(0)
+        return client
+
+    first = asyncio.run(use_client())
+    second = asyncio.run(use_client())
+    assert first is not second
+    assert first.is_closed
+    assert not second.is_closed
+
+
+def test_oauth_shares_configuration():
+    """Test that OAuth instances are configured in the same way"""
+    pio = PlacementsIO(environment="staging", token="foo", max_concurrency=7)
+    oauth = PlacementsIO_OAuth(environment="staging", max_concurrency=7)
+    assert oauth.settings.keys() == pio.settings.keys()
+    assert oauth.settings["max_concurrency"] == 7
+    assert oauth.settings["token"] == oauth.token
+    assert oauth.accounts.connection is oauth.connection
@@ -0,0 +1,104 @@
+"""
+Tests for the CREATE method of the PlacementsIO class
+"""
+
+import json
+from unittest.mock import patch
+import pytest
+import httpx
+from pytest_httpx import HTTPXMock
+from pio import PlacementsIO
+
+
+@pytest.fixture()
+def mock_create_flaky(httpx_mock: HTTPXMock):
+    """
+    Mocks CREATE requests where the first attempt for "flaky" objects fails
+    """
+    captured_requests = []
+
+    def custom_response(request):
+        captured_requests.append(request)
+        resource = json.loads(request.content)["data"]
+        name = resource["attributes"]["name"]
+        attempts = [
+            _
+            for _ in captured_requests
+            if json.loads(_.content) == json.loads(request.content)
+        ]
+        if name.startswith("flaky") and len(attempts) == 1:
+            status_code = 502 if name.endswith("502") else 503
+            return httpx.Response(status_code=status_code, json={"errors": []})
+        return httpx.Response(
+            status_code=201,
+            json={"data": {**resource, "id": str(len(captured_requests))}},
+        )
+
+    httpx_mock.add_callback(custom_response)
+    return captured_requests
+
+
+@patch("pio.client.CREATE_RETRY_DELAY", 0)
+@pytest.mark.httpx_mock(can_send_already_matched_responses=True)
+@pytest.mark.asyncio
+async def test_create_retries_only_failed_objects(mock_create_flaky):
+    """Tests that only the objects which failed are sent again"""
+    pio = PlacementsIO(environment="staging", token="foo")
+    objects = [{"attributes": {"name": name}} for name in ["a", "flaky", "b"]]
+    api_response = await pio.creatives.create(objects)
+    assert len(mock_create_flaky) == 4
+    assert [_["attributes"]["name"] for _ in api_response] == ["a", "flaky", "b"]
+    assert all(_.get("id") for _ in api_response)
+
+
+@patch("pio.client.CREATE_RETRY_DELAY", 0)
+@pytest.mark.httpx_mock(can_send_already_matched_responses=True)
+@pytest.mark.asyncio
+async def test_create_does_not_retry_possibly_processed(mock_create_flaky):
+    """Tests that a 502 is not retried as the object may have been created"""
+    pio = PlacementsIO(environment="staging", token="foo")
+    api_response = await pio.creatives.create([{"attributes": {"name": "flaky502"}}])
+    assert len(mock_create_flaky) == 1
+    assert "errors" in api_response[0]
+
+
+@patch("pio.client.CREATE_RETRY_DELAY", 0)
+@pytest.mark.httpx_mock(can_send_already_matched_responses=True)
+@pytest.mark.asyncio
+async def test_create_idempotency_key(mock_create_flaky):
+    """Tests that objects sharing an idempotency key are created once"""
+    pio = PlacementsIO(environment="staging", token="foo")
+    objects = [
+        {"attributes": {"name": "flaky502"}},
+        {"attributes": {"name": "flaky502"}},
+    ]
+    api_response = await pio.creatives.create(
+        objects, idempotency_key=lambda resource: resource["attributes"]["name"]
+    )
+    assert len(mock_create_flaky) == 1
+    assert "Idempotency-Key" not in mock_create_flaky[0].headers
+    assert api_response[0] == api_response[1]
+    assert "errors" in api_response[0]
+
+
+@pytest.mark.httpx_mock(can_send_already_matched_responses=True)
+@pytest.mark.asyncio
+async def test_create_undecodable_error(httpx_mock: HTTPXMock):
+    """Tests that an HTML error is returned for its object only"""
+
+    def custom_response(request):
+        resource = json.loads(request.content)["data"]
+        if resource["attributes"]["name"] == "html":
+            return httpx.Response(
+                status_code=504,
+                content=b"<html>Gateway Timeout</html>",
+                headers={"Content-Type": "text/html"},
+            )
+        return httpx.Response(status_code=201, json={"data": {**resource, "id": "1"}})
+
+    httpx_mock.add_callback(custom_response)
+    pio = PlacementsIO(environment="staging", token="foo")
+    objects = [{"attributes": {"name": name}} for name in ["a", "html", "b"]]
+    api_response = await pio.creatives.create(objects)
+    assert api_response[0]["id"] == "1" and api_response[2]["id"] == "1"
+    assert api_response[1]["errors"][0]["title"] == "504 Gateway Timeout"
@@ -0,0 +1,62 @@
+"""
+Tests for the streaming CSV reader utility
+"""
+
+import pytest
+from pio.utility.csv_reader import iterate_csv
+
+
+async def aiter_lines(lines):
+    """Yields lines in the same way as httpx.Response.aiter_lines"""
+    for line in lines:
+        yield line
+
+
+@pytest.mark.asyncio
+async def test_iterate_csv_rows():
+    """Test that rows are parsed one line at a time"""
+    lines = ["A,B", "1,2", "", "3,4"]
+    rows = [row async for row in iterate_csv(aiter_lines(lines))]
+    assert rows == [["A", "B"], ["1", "2"], [], ["3", "4"]]
+
+
+@pytest.mark.asyncio
+async def test_iterate_csv_quoted_values():
+    """Test that quoted values spanning several lines are kept together"""
+    lines = ["A,B", '"multi', 'line",2', '"quoted ""value""",3\r\n']
+    rows = [row async for row in iterate_csv(aiter_lines(lines))]
+    assert rows == [["A", "B"], ["multi\nline", "2"], ['quoted "value"', "3"]]
+
+
+@pytest.mark.asyncio
+async def test_iterate_csv_offloaded_in_batches():
+    """Test that records are parsed in batches by the offload function"""
+    batches = []
+
+    async def offload(func, records):
+        batches.append(len(records))
+        return func(records)
+
+    lines = ["A,B", '"multi', 'line",2', "3,4", "5,6"]
+    rows = [row async for row in iterate_csv(aiter_lines(lines), offload, batch_size=3)]
+    assert rows == [["A", "B"], ["multi\nline", "2"], ["3", "4"], ["5", "6"]]
+    assert batches == [3, 1]
+
+
+@pytest.mark.asyncio
+async def test_iterate_csv_bare_quotes():
+    """Test that quotes inside unquoted values are kept as literal characters"""
+
+    async def offload(func, records):
+        return func(records)
+
+    lines = ["name,size", 'Tower 5",x', "Leader,728x90", '"Box 3""",a"b']
+    expected = [
+        ["name", "size"],
+        ['Tower 5"', "x"],
+        ["Leader", "728x90"],
+        ['Box 3"', 'a"b'],
+    ]
+    assert [row async for row in iterate_csv(aiter_lines(lines))] == expected
+    rows = [row async for row in iterate_csv(aiter_lines(lines), offload)]
+    assert rows == expected
@@ -0,0 +1,93 @@
+"""
+Tests for the entity store
+"""
+
+import gc
+import pytest
+from pytest_httpx import HTTPXMock
+from pio import PlacementsIO
+from pio.utility.entity_store import EntityStore
+
+CAMPAIGN = {
+    "type": "campaigns",
+    "id": "1",
+    "attributes": {"name": "Campaign", "budget": 100},
+    "relationships": {"opportunity": {"data": {"type": "opportunities", "id": "2"}}},
+}
+OPPORTUNITY = {"type": "opportunities", "id": "2", "attributes": {"name": "Deal"}}
+
+
+def test_entity_store_merge_updates_in_place():
+    """Test that a resource is stored once and updated in place"""
+    store = EntityStore()
+    campaign = store.merge(CAMPAIGN)
+    updated = store.merge(
+        {"type": "campaigns", "id": 1, "attributes": {"name": "Renamed"}}
+    )
+    assert updated is campaign
+    assert campaign["attributes"] == {"name": "Renamed", "budget": 100}
+    assert CAMPAIGN["attributes"]["name"] == "Campaign"
+    assert store.get("campaigns", 1) is campaign
+    assert store.stats == {"size": 1, "updates": 1}
+
+
+def test_entity_store_relationships_resolve_to_entities():
+    """Test that relationships resolve to the stored resources"""
+    store = EntityStore()
+    campaign = store.merge(CAMPAIGN)
+    opportunity = store.merge(OPPORTUNITY)
+    assert campaign["relationships"]["opportunity"]["data"] is opportunity
+    assert store.resolve({"type": "accounts", "id": "3"}) == {
+        "type": "accounts",
+        "id": "3",
+    }
+
+
+def test_entity_store_releases_unreferenced_entities():
+    """Test that resources are dropped once nothing refers to them"""
+    store = EntityStore()
+    campaign = store.merge(CAMPAIGN)
+    del campaign
+    gc.collect()
+    assert store.get("campaigns", 1) is None
+
+
+@pytest.mark.asyncio
+@pytest.mark.httpx_mock(can_send_already_matched_responses=True)
+async def test_entity_store_shared_between_responses(httpx_mock: HTTPXMock):
+    """Test that responses and updates share and refresh the same resources"""
+    httpx_mock.add_response(
+        method="GET",
+        json={"data": [CAMPAIGN], "included": [OPPORTUNITY], "meta": {}},
+    )
+    httpx_mock.add_response(
+        method="PATCH",
+        json={"data": {**CAMPAIGN, "attributes": {"name": "Updated"}}},
+    )
+    pio = PlacementsIO(environment="staging", token="foo", entity_store=EntityStore())
+    first = await pio.campaigns.get(include=["opportunity"])
+    second = await pio.campaigns.get(include=["opportunity"])
+    assert first[0] is second[0]
+    opportunity = first[0]["relationships"]["opportunity"]["data"]
+    assert opportunity is second.included[0]
+    assert opportunity["attributes"]["name"] == "Deal"
+
+    results = await pio.campaigns.update([1], attributes={"name": "Updated"})
+    assert results[0] is first[0]
+    assert first[0]["attributes"] == {"name": "Updated", "budget": 100}
+
+
+@pytest.mark.asyncio
+@pytest.mark.httpx_mock(can_send_already_matched_responses=True)
+async def test_entity_store_keeps_included_resources(httpx_mock: HTTPXMock):
+    """Test that included resources are kept once the response is released"""
+    httpx_mock.add_response(
+        json={"data": [CAMPAIGN], "included": [OPPORTUNITY], "meta": {}}
+    )
+    pio = PlacementsIO(environment="staging", token="foo", entity_store=EntityStore())
+    campaign = await pio.campaigns.first(include=["opportunity"])
+    campaigns = await pio.campaigns.get_many([1], include=["opportunity"])
+    gc.collect()
+    for resource in (campaign, campaigns[1]):
+        opportunity = resource["relationships"]["opportunity"]["data"]
+        assert opportunity["attributes"]["name"] == "Deal"
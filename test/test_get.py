@@ -3,13 +3,17 @@ Tests for the GET method of the PlacementsIO class
 """
 
 import re
+import time
+import asyncio
 import json
+from unittest.mock import patch
 import pytest
 import httpx
 from pytest_httpx import HTTPXMock
 from pio import PlacementsIO
 from pio.model.service import services
 from pio.model.response import APIResponse
+from pio.utility.cache import ResponseCache
 from pio.error.api_error import APIError
 
 API_SERVICES = [_ for _ in services if _ != "reports"]
@@ -99,6 +103,8 @@ async def test_get_rate_limit(mock_rate_limit):
     api_response = await pio.accounts.get()
     print("API Response", api_response)
     assert isinstance(api_response, list)
+    assert pio.rate_limiter.state["throttled"] == 1
+    assert pio.rate_limiter.state["in_flight"] == 0
 
 
 # ============================================================================
@@ -371,3 +377,483 @@ async def test_fields_with_include_sends_both_params(mock_get_capture_request):
     # Include is merged into primary resource's fields to ensure relationship data is returned
     assert params["fields[campaigns]"] == "name,advertiser"
     assert params["fields[accounts]"] == "custom-fields"
+
+
+# ============================================================================
+# Tests for bounded concurrency pagination
+# ============================================================================
+
+
+@pytest.fixture()
+def mock_get_paginated(httpx_mock: HTTPXMock):
+    """
+    Mocks a paginated GET request and records the peak number of requests in flight
+    """
+    state = {"in_flight": 0, "peak": 0, "requests": 0, "sizes": set()}
+
+    async def custom_response(request):
+        state["requests"] += 1
+        state["sizes"].add(request.url.params["page[size]"])
+        state["in_flight"] += 1
+        state["peak"] = max(state["peak"], state["in_flight"])
+        await asyncio.sleep(0.01)
+        state["in_flight"] -= 1
+        page = int(request.url.params["page[number]"])
+        return httpx.Response(
+            status_code=200,
+            json={
+                "data": [{"type": "line_items", "id": str(page)}],
+                "meta": {"page-count": 8},
+            },
+        )
+
+    httpx_mock.add_callback(custom_response)
+    return state
+
+
+@pytest.mark.httpx_mock(can_send_already_matched_responses=True)
+@pytest.mark.asyncio
+async def test_pagination_bounded_concurrency(mock_get_paginated):
+    """Test that page fetches are bounded per call and returned in order"""
+    pio = PlacementsIO(environment="staging", token="foo")
+    api_response = await pio.line_items.get(max_concurrency=2)
+    assert [item["id"] for item in api_response] == [str(_) for _ in range(1, 9)]
+    assert mock_get_paginated["peak"] == 2
+
+
+@pytest.mark.httpx_mock(can_send_already_matched_responses=True)
+@pytest.mark.asyncio
+async def test_pagination_instance_concurrency(mock_get_paginated):
+    """Test that the instance wide concurrency limit is used by default"""
+    pio = PlacementsIO(environment="staging", token="foo", max_concurrency=3)
+    api_response = await pio.line_items.get()
+    assert len(api_response) == 8
+    assert mock_get_paginated["peak"] == 3
+
+
+# ============================================================================
+# Tests for streaming iterators
+# ============================================================================
+
+
+@pytest.mark.httpx_mock(can_send_already_matched_responses=True)
+@pytest.mark.asyncio
+async def test_iter_yields_resources_in_order(mock_get_paginated):
+    """Test that iter yields every resource across pages in order"""
+    pio = PlacementsIO(environment="staging", token="foo")
+    ids = [resource["id"] async for resource in pio.line_items.iter()]
+    assert ids == [str(_) for _ in range(1, 9)]
+
+
+@pytest.mark.httpx_mock(can_send_already_matched_responses=True)
+@pytest.mark.asyncio
+async def test_iter_pages_yields_api_responses(mock_get_paginated):
+    """Test that iter_pages yields an APIResponse per page"""
+    pio = PlacementsIO(environment="staging", token="foo")
+    pages = [page async for page in pio.line_items.iter_pages(max_concurrency=2)]
+    assert len(pages) == 8
+    assert all(isinstance(page, APIResponse) for page in pages)
+    assert pages[0].meta["page-count"] == 8
+
+
+@pytest.mark.httpx_mock(
+    can_send_already_matched_responses=True,
+    assert_all_requests_were_expected=False,
+)
+@pytest.mark.asyncio
+async def test_iter_bounded_read_ahead(mock_get_paginated):
+    """Test that stopping early does not download every page"""
+    pio = PlacementsIO(environment="staging", token="foo")
+    pages = pio.line_items.iter_pages(max_concurrency=2)
+    async for page in pages:
+        if page.meta:
+            break
+    await pages.aclose()
+    assert mock_get_paginated["requests"] <= 3
+
+
+# ============================================================================
+# Tests for batched multi-ID GET requests
+# ============================================================================
+
+
+@pytest.fixture()
+def mock_get_ids(httpx_mock: HTTPXMock):
+    """
+    Mocks a GET request which returns a resource for every ID filtered
+    """
+    captured_requests = []
+
+    def custom_response(request):
+        captured_requests.append(request)
+        ids = request.url.params["filter[id]"].split(",")
+        return httpx.Response(
+            status_code=200,
+            json={
+                "data": [{"type": "accounts", "id": _} for _ in ids if _ != "999"],
+                "meta": {"page-count": 1},
+            },
+        )
+
+    httpx_mock.add_callback(custom_response)
+    return captured_requests
+
+
+@pytest.mark.httpx_mock(can_send_already_matched_responses=True)
+@pytest.mark.asyncio
+async def test_get_many_batches_ids(mock_get_ids):
+    """Test that IDs are batched into pages and returned keyed by ID"""
+    pio = PlacementsIO(environment="staging", token="foo")
+    resource_ids = list(range(1, 251)) + [999]
+    api_response = await pio.accounts.get_many(resource_ids)
+    assert len(mock_get_ids) == 3
+    assert len(api_response) == 250
+    assert api_response[1]["id"] == "1"
+    assert api_response[250]["id"] == "250"
+    assert 999 not in api_response
+
+
+# ============================================================================
+# Tests for lazy relationship resolution
+# ============================================================================
+
+
+@pytest.mark.asyncio
+async def test_lazy_relationships_merged(mock_get_with_included):
+    """Test that lazy responses resolve included resources when accessed"""
+    pio = PlacementsIO(environment="staging", token="foo")
+    api_response = await pio.campaigns.get(lazy=True)
+
+    campaign = api_response[0]
+    opportunity_data = campaign["relationships"]["opportunity"]["data"]
+    nested_account = opportunity_data["relationships"]["account"]["data"]
+    assert nested_account["attributes"]["name"] == "Test Advertiser Inc."
+
+
+# ============================================================================
+# Tests for de-duplicating included resources across pages
+# ============================================================================
+
+
+@pytest.fixture()
+def mock_get_paginated_included(httpx_mock: HTTPXMock):
+    """
+    Mocks a paginated GET request where every page includes the same campaign
+    """
+
+    def custom_response(request):
+        page = int(request.url.params["page[number]"])
+        return httpx.Response(
+            status_code=200,
+            json={
+                "data": [
+                    {
+                        "type": "line_items",
+                        "id": str(page),
+                        "relationships": {
+                            "campaign": {"data": {"type": "campaigns", "id": "1"}}
+                        },
+                    }
+                ],
+                "included": [
+                    {"type": "campaigns", "id": "1", "attributes": {"name": "C"}},
+                    {"type": "accounts", "id": str(page)},
+                ],
+                "meta": {"page-count": 5},
+            },
+        )
+
+    httpx_mock.add_callback(custom_response)
+
+
+@pytest.mark.httpx_mock(can_send_already_matched_responses=True)
+@pytest.mark.asyncio
+async def test_included_deduplicated_across_pages(mock_get_paginated_included):
+    """Test that included resources are only kept once across pages"""
+    pio = PlacementsIO(environment="staging", token="foo")
+    api_response = await pio.line_items.get(include=["campaign"])
+    assert len(api_response) == 5
+    assert len(api_response.included) == 6
+    assert api_response.meta["included-duplicates"] == 4
+    assert all(
+        item["relationships"]["campaign"]["data"]["attributes"]["name"] == "C"
+        for item in api_response
+    )
+
+
+# ============================================================================
+# Tests for offloading decoding and merging to a worker pool
+# ============================================================================
+
+
+@pytest.mark.httpx_mock(can_send_already_matched_responses=True)
+@pytest.mark.asyncio
+async def test_get_with_thread_executor(mock_get_paginated_included):
+    """Test that pages are decoded and merged in worker threads"""
+    async with PlacementsIO(
+        environment="staging", token="foo", executor="thread", workers=2
+    ) as pio:
+        api_response = await pio.line_items.get(include=["campaign"])
+        pages = [page async for page in pio.line_items.iter_pages()]
+    assert [item["id"] for item in api_response] == [str(_) for _ in range(1, 6)]
+    assert api_response.meta["included-duplicates"] == 4
+    assert api_response[0]["relationships"]["campaign"]["data"]["attributes"] == {
+        "name": "C"
+    }
+    assert len(pages) == 5
+
+
+# ============================================================================
+# Tests for configurable page sizes
+# ============================================================================
+
+
+@pytest.mark.httpx_mock(can_send_already_matched_responses=True)
+@pytest.mark.asyncio
+async def test_page_size_call_service_and_instance(mock_get_capture_request):
+    """Test that page sizes are resolved from the call, service then instance"""
+    pio = PlacementsIO(
+        environment="staging",
+        token="foo",
+        page_size=250,
+        page_sizes={"campaigns": 50},
+        max_page_size=500,
+    )
+    await pio.line_items.get()
+    await pio.campaigns.get()
+    await pio.campaigns.get(page_size=1000)
+    sizes = [request.url.params["page[size]"] for request in mock_get_capture_request]
+    assert sizes == ["250", "50", "500"]
+
+
+@pytest.mark.httpx_mock(can_send_already_matched_responses=True)
+@pytest.mark.asyncio
+async def test_page_size_auto(mock_get_paginated):
+    """Test that the auto page size is used for every page of a request"""
+    pio = PlacementsIO(environment="staging", token="foo", page_size="auto")
+    pio.page_tuner.sizes["line_items"] = 400
+    await pio.line_items.get()
+    assert mock_get_paginated["sizes"] == {"400"}
+
+
+@pytest.mark.httpx_mock(can_send_already_matched_responses=True)
+@pytest.mark.asyncio
+async def test_page_size_tuner_only_observes_auto(mock_get_paginated):
+    """Test that pages are only recorded with the tuner for auto page sizes"""
+    pio = PlacementsIO(
+        environment="staging", token="foo", page_sizes={"accounts": "auto"}
+    )
+    with patch.object(pio.page_tuner, "observe") as observe:
+        await pio.line_items.get()
+        assert not observe.called
+        await pio.accounts.get()
+        assert observe.call_count == 8
+
+
+# ============================================================================
+# Tests for early terminating queries
+# ============================================================================
+
+
+@pytest.mark.httpx_mock(can_send_already_matched_responses=True)
+@pytest.mark.asyncio
+async def test_get_limit_stops_paginating(mock_get_paginated):
+    """Test that only the pages needed for the limit are requested"""
+    pio = PlacementsIO(environment="staging", token="foo")
+    api_response = await pio.line_items.get(limit=3, page_size=2)
+    assert len(api_response) == 2
+    assert mock_get_paginated["requests"] == 2
+    assert mock_get_paginated["sizes"] == {"2"}
+
+
+@pytest.mark.httpx_mock(can_send_already_matched_responses=True)
+@pytest.mark.asyncio
+async def test_get_limit_sizes_first_page(mock_get_paginated):
+    """Test that a limit below the page size is requested as a single page"""
+    pio = PlacementsIO(environment="staging", token="foo")
+    api_response = await pio.line_items.get(limit=5)
+    assert len(api_response) == 1
+    assert mock_get_paginated["requests"] == 1
+    assert mock_get_paginated["sizes"] == {"5"}
+
+
+@pytest.mark.httpx_mock(can_send_already_matched_responses=True)
+@pytest.mark.asyncio
+async def test_first_and_exists(mock_get_paginated):
+    """Test that first and exists make a single request for one resource"""
+    pio = PlacementsIO(environment="staging", token="foo")
+    line_item = await pio.line_items.first(name="Example")
+    assert line_item["id"] == "1"
+    assert await pio.line_items.exists(name="Example")
+    assert mock_get_paginated["requests"] == 2
+    assert mock_get_paginated["sizes"] == {"1"}
+
+
+@pytest.mark.httpx_mock(can_send_already_matched_responses=True)
+@pytest.mark.asyncio
+async def test_first_no_results(mock_get_capture_request):
+    """Test that first returns None and exists False without matches"""
+    pio = PlacementsIO(environment="staging", token="foo")
+    assert await pio.users.first(email="missing@example.com") is None
+    assert not await pio.users.exists(email="missing@example.com")
+    assert mock_get_capture_request[0].url.params["filter[email]"] == (
+        "missing@example.com"
+    )
+
+
+@pytest.mark.asyncio
+async def test_get_limit_zero(httpx_mock: HTTPXMock):
+    """Test that a limit of 0 returns no resources without a request"""
+    pio = PlacementsIO(environment="staging", token="foo")
+    assert await pio.line_items.get(limit=0) == []
+    with pytest.raises(ValueError):
+        await pio.line_items.get(limit=-1)
+    assert not httpx_mock.get_requests()
+
+
+# ============================================================================
+# Tests for counting resources
+# ============================================================================
+
+
+@pytest.fixture()
+def mock_get_count(httpx_mock: HTTPXMock):
+    """
+    Mocks a GET request returning the record count for the filtered service
+    """
+    captured_requests = []
+
+    def custom_response(request):
+        captured_requests.append(request)
+        match = re.match(URL_REGEX, str(request.url))
+        meta = {"page-count": 40}
+        if match.group(1) == "line_items":
+            meta["record-count"] = int(request.url.params.get("filter[campaign_id]", 7))
+        return httpx.Response(
+            status_code=200,
+            json={"data": [{"type": match.group(1), "id": "1"}], "meta": meta},
+        )
+
+    httpx_mock.add_callback(custom_response)
+    return captured_requests
+
+
+@pytest.mark.asyncio
+async def test_count_single_minimal_request(mock_get_count):
+    """Test that count requests one resource without attributes"""
+    pio = PlacementsIO(environment="staging", token="foo")
+    assert await pio.line_items.count(campaign_id=12) == 12
+    request = mock_get_count[0]
+    assert request.url.params["page[size]"] == "1"
+    assert request.url.params["fields[line-items]"] == ""
+    assert request.url.params["filter[campaign_id]"] == "12"
+
+
+@pytest.mark.asyncio
+async def test_count_estimated_from_page_count(mock_get_count):
+    """Test that the page count is used when there is no record count"""
+    pio = PlacementsIO(environment="staging", token="foo")
+    assert await pio.accounts.count() == 40
+
+
+@pytest.mark.httpx_mock(can_send_already_matched_responses=True)
+@pytest.mark.asyncio
+async def test_count_many_and_services(mock_get_count):
+    """Test counting several filters and services concurrently"""
+    pio = PlacementsIO(environment="staging", token="foo")
+    counts = await pio.line_items.count_many([{"campaign_id": 3}, {"campaign_id": 5}])
+    assert counts == [3, 5]
+    counts = await pio.count({"line_items": {}, "accounts": None})
+    assert counts == {"line_items": 7, "accounts": 40}
+
+
+# ============================================================================
+# Tests for the response cache
+# ============================================================================
+
+
+@pytest.mark.httpx_mock(can_send_already_matched_responses=True)
+@pytest.mark.asyncio
+async def test_get_served_from_cache(mock_get_paginated):
+    """Test that repeated GET requests are served from the cache"""
+    cache = ResponseCache()
+    pio = PlacementsIO(environment="staging", token="foo", cache=cache)
+    first = await pio.line_items.get()
+    first[0]["id"] = "modified"
+    second = await pio.line_items.get()
+    assert [item["id"] for item in second] == [str(_) for _ in range(1, 9)]
+    assert mock_get_paginated["requests"] == 8
+    assert cache.stats["hits"] == 8
+    await pio.line_items.get(name="Other")
+    assert mock_get_paginated["requests"] == 16
+
+
+@pytest.mark.httpx_mock(can_send_already_matched_responses=True)
+@pytest.mark.asyncio
+async def test_cache_invalidated_by_writes(mock_get_capture_request):
+    """Test that updates and creates invalidate cached responses"""
+    pio = PlacementsIO(environment="staging", token="foo", cache=ResponseCache())
+    await pio.accounts.get()
+    await pio.accounts.get()
+    assert len(mock_get_capture_request) == 1
+    await pio.accounts.update([1], attributes={"name": "A"})
+    await pio.accounts.get()
+    await pio.accounts.create([{"attributes": {"name": "B"}}])
+    await pio.accounts.get()
+    methods = [request.method for request in mock_get_capture_request]
+    assert methods == ["GET", "PATCH", "GET", "POST", "GET"]
+
+
+@pytest.mark.httpx_mock(can_send_already_matched_responses=True)
+@pytest.mark.asyncio
+async def test_cache_invalidates_relationship_pages(mock_get_capture_request):
+    """Test that writes invalidate pages cached from relationship URLs"""
+    cache = ResponseCache()
+    pio = PlacementsIO(environment="staging", token="foo", cache=cache)
+    await pio.relationship(f"{pio.base_url}campaigns/1/line-items").get()
+    await pio.accounts.get()
+    await pio.line_items.get()
+    await pio.line_items.update([1], attributes={"name": "A"})
+    assert cache.stats["size"] == 1
+    await pio.relationship(f"{pio.base_url}campaigns/1/line-items").get()
+    assert len(mock_get_capture_request) == 5
+
+
+@pytest.mark.asyncio
+async def test_conditional_get_not_modified(httpx_mock: HTTPXMock):
+    """Test that expired responses are revalidated and 304s served from cache"""
+    httpx_mock.add_response(
+        json={"data": [{"type": "accounts", "id": "1"}]},
+        headers={"ETag": '"v1"', "Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"},
+    )
+    httpx_mock.add_response(status_code=304)
+    cache = ResponseCache(ttl=1)
+    pio = PlacementsIO(environment="staging", token="foo", cache=cache)
+    await pio.accounts.get()
+    with patch("pio.utility.cache.time.monotonic", return_value=time.monotonic() + 5):
+        accounts = await pio.accounts.get()
+    assert accounts[0]["id"] == "1"
+    request = httpx_mock.get_requests()[1]
+    assert request.headers["If-None-Match"] == '"v1"'
+    assert request.headers["If-Modified-Since"] == "Mon, 01 Jan 2024 00:00:00 GMT"
+    assert cache.stats["revalidated"] == 1
+    assert cache.stats["bytes_saved"] > 0
+
+
+@pytest.mark.asyncio
+@pytest.mark.httpx_mock(can_send_already_matched_responses=True)
+async def test_conditional_get_zero_ttl(httpx_mock: HTTPXMock):
+    """Test that services with a TTL of 0 revalidate every request"""
+    httpx_mock.add_response(
+        json={"data": [{"type": "accounts", "id": "1"}]}, headers={"ETag": '"v1"'}
+    )
+    httpx_mock.add_response(status_code=304)
+    cache = ResponseCache(ttls={"accounts": 0})
+    pio = PlacementsIO(environment="staging", token="foo", cache=cache)
+    for _ in range(3):
+        assert (await pio.accounts.get())[0]["id"] == "1"
+    requests = httpx_mock.get_requests()
+    assert len(requests) == 3
+    assert all(request.headers["If-None-Match"] == '"v1"' for request in requests[1:])
+    assert cache.stats["hits"] == 0
+    assert cache.stats["revalidated"] == 2
@@ -0,0 +1,87 @@
+"""
+Tests for the JSON codec utility
+"""
+
+import json
+import datetime
+import decimal
+from unittest.mock import patch
+import pytest
+from pio.model.response import APIResponse
+from pio.utility.json_codec import JSONCodec, OrjsonCodec, default_codec
+
+VALUE = {
+    "datetime": datetime.datetime(
+        2024, 12, 1, 13, 0, 0, tzinfo=datetime.timezone(datetime.timedelta(hours=-5))
+    ),
+    "date": datetime.date(2024, 12, 1),
+    "decimal": decimal.Decimal("1.10"),
+    "list": [1, "two", None, True],
+}
+EXPECTED = {
+    "datetime": "2024-12-01T13:00:00-05:00",
+    "date": "2024-12-01",
+    "decimal": "1.10",
+    "list": [1, "two", None, True],
+}
+
+
+def codecs():
+    """Returns every codec available"""
+    available = [JSONCodec()]
+    try:
+        import orjson  # pylint: disable=import-outside-toplevel,unused-import
+
+        available.append(OrjsonCodec())
+    except ImportError:  # pragma: no cover
+        pass
+    return available
+
+
+@pytest.mark.parametrize("codec", codecs(), ids=lambda codec: codec.name)
+def test_codec_dumps(codec):
+    """Test that objects are encoded to bytes in the same way as JSONEncoder"""
+    encoded = codec.dumps(VALUE)
+    assert isinstance(encoded, bytes)
+    assert json.loads(encoded) == EXPECTED
+
+
+@pytest.mark.parametrize("codec", codecs(), ids=lambda codec: codec.name)
+def test_codec_loads(codec):
+    """Test that bytes and text are decoded"""
+    assert codec.loads(b'{"data": [1, 2]}') == {"data": [1, 2]}
+    assert codec.loads('{"data": [1, 2]}') == {"data": [1, 2]}
+
+
+def test_default_codec():
+    """Test that the fastest available codec is used by default"""
+    assert default_codec().name == codecs()[-1].name
+
+
+def test_default_codec_without_orjson():
+    """Test that the standard library codec is used when orjson is missing"""
+    with patch("pio.utility.json_codec.orjson", None):
+        assert default_codec().name == "json"
+
+
+@pytest.mark.parametrize("codec", codecs(), ids=lambda codec: codec.name)
+def test_codec_dumps_matches_json(codec):
+    """Test that every codec encodes the same objects as the standard library"""
+    value = {"attributes": {1: "x", "big": 2**70}}
+    assert json.loads(codec.dumps(value)) == {"attributes": {"1": "x", "big": 2**70}}
+    response = APIResponse(
+        data=[
+            {
+                "type": "campaigns",
+                "id": "1",
+                "relationships": {
+                    "opportunity": {"data": {"type": "opportunities", "id": "2"}}
+                },
+            }
+        ],
+        included=[{"type": "opportunities", "id": "2", "attributes": {"name": "A"}}],
+        lazy=True,
+    )
+    assert json.loads(codec.dumps(response)) == json.loads(json.dumps(response))
+    opportunity = json.loads(codec.dumps(response))[0]["relationships"]["opportunity"]
+    assert opportunity["data"]["attributes"] == {"name": "A"}
@@ -1,5 +1,6 @@
 import json
-from datetime import datetime
+from datetime import date, datetime
+from decimal import Decimal
 from zoneinfo import ZoneInfo
 from pio.utility.json_encoder import JSONEncoder
 
@@ -19,3 +20,11 @@ def test_standard_json():
 
     input = {"test": True}
     assert json.dumps(input, cls=JSONEncoder) == json.dumps(input)
+
+
+def test_date_and_decimal_handling():
+
+    obj = {"date": date(2024, 12, 1), "amount": Decimal("1.10")}
+    json_obj = json.dumps(obj, cls=JSONEncoder)
+
+    assert json_obj == '{"date": "2024-12-01", "amount": "1.10"}'
@@ -0,0 +1,186 @@
+"""
+Tests for the local SQLite mirror
+"""
+
+import json
+import threading
+from unittest.mock import patch
+import pytest
+from pytest_httpx import HTTPXMock
+from pio import PlacementsIO
+from pio.mirror import Mirror
+from pio.model.response import APIResponse
+from pio.sync import Sync
+
+
+def line_item(resource_id: int, campaign_id: int, status: str) -> dict:
+    """Returns a line item resource related to a campaign"""
+    return {
+        "type": "line-items",
+        "id": str(resource_id),
+        "attributes": {"name": f"Line Item {resource_id}", "delivery-status": status},
+        "relationships": {
+            "campaign": {"data": {"type": "campaigns", "id": str(campaign_id)}},
+            "creatives": {"data": [{"type": "creatives", "id": "9"}]},
+            "group": {"data": None},
+        },
+    }
+
+
+@pytest.fixture()
+def mirror(tmp_path):
+    """Returns a mirror with line items, campaigns and an account"""
+    mirror = Mirror(str(tmp_path / "mirror.db"))
+    response = APIResponse(
+        data=[
+            line_item(1, 10, "delivering"),
+            line_item(2, 10, "paused"),
+            line_item(3, 20, "delivering"),
+        ],
+        included=[
+            {
+                "type": "campaigns",
+                "id": "10",
+                "attributes": {"name": "Campaign 10"},
+                "relationships": {
+                    "advertiser": {"data": {"type": "accounts", "id": "5"}}
+                },
+            },
+            {"type": "accounts", "id": "5", "attributes": {"name": "Advertiser"}},
+        ],
+    )
+    mirror.merge("line_items", response)
+    mirror.save()
+    return mirror
+
+
+def test_mirror_query_relationships_and_attributes(mirror):
+    """Test that resources are queried by related ids and attributes"""
+    mirror.index("line_items", "delivery-status")
+    response = mirror.query(
+        "line_items",
+        attributes={"delivery-status": "delivering"},
+        relationships={"campaign": 10},
+    )
+    assert isinstance(response, APIResponse)
+    assert [item["id"] for item in response] == ["1"]
+    relationships = response[0]["relationships"]
+    assert relationships["campaign"]["data"] == {"type": "campaigns", "id": "10"}
+    assert relationships["creatives"]["data"] == [{"type": "creatives", "id": "9"}]
+    assert relationships["group"]["data"] is None
+    assert len(mirror.query("line_items", relationships={"creatives": 9})) == 3
+    assert len(mirror.query("line_items", limit=2)) == 2
+
+
+def test_mirror_query_include(mirror):
+    """Test that included resources are merged in the same shape as the API"""
+    response = mirror.query(
+        "line_items", relationships={"campaign": 10}, include=["campaign.advertiser"]
+    )
+    campaign = response[0]["relationships"]["campaign"]["data"]
+    assert campaign["attributes"]["name"] == "Campaign 10"
+    advertiser = campaign["relationships"]["advertiser"]["data"]
+    assert advertiser["attributes"]["name"] == "Advertiser"
+    assert len(response.included) == 2
+
+
+def test_mirror_merge_replaces_resources(mirror, tmp_path):
+    """Test that merged resources replace their attributes and relationships"""
+    mirror.merge("line_items", [line_item(1, 20, "paused")])
+    mirror.save()
+    mirror = Mirror(str(tmp_path / "mirror.db"))
+    assert mirror.get("line_items", 1)["attributes"]["delivery-status"] == "paused"
+    assert len(mirror.query("line_items", relationships={"campaign": 10})) == 1
+    assert len(mirror.query("line_items", relationships={"campaign": 20})) == 2
+
+
+def test_mirror_merge_keeps_missing_fields(mirror):
+    """Test that sparse or links only copies of a resource keep stored values"""
+    response = APIResponse(
+        data=[{"type": "groups", "id": "1", "attributes": {"name": "Group"}}],
+        included=[
+            {
+                "type": "line-items",
+                "id": "1",
+                "attributes": {"name": "Renamed"},
+                "relationships": {
+                    "campaign": {"links": {"related": "line-items/1/campaign"}}
+                },
+            }
+        ],
+    )
+    mirror.merge("groups", response)
+    response = mirror.query(
+        "line_items", {"delivery-status": "delivering"}, {"campaign": 10}
+    )
+    assert len(response) == 1
+    assert response[0]["attributes"]["name"] == "Renamed"
+    assert response[0]["relationships"]["campaign"] == {
+        "links": {"related": "line-items/1/campaign"},
+        "data": {"type": "campaigns", "id": "10"},
+    }
+
+
+@pytest.mark.asyncio
+async def test_mirror_as_sync_store(tmp_path, httpx_mock: HTTPXMock):
+    """Test that a sync loads resources into the mirror"""
+    httpx_mock.add_response(json={"data": [line_item(1, 10, "delivering")], "meta": {}})
+    mirror = Mirror(str(tmp_path / "mirror.db"))
+    pio = PlacementsIO(environment="staging", token="foo")
+    sync = Sync(pio, mirror, str(tmp_path / "checkpoint.json"))
+    assert await sync.run(["line_items"]) == {"line_items": 1}
+    assert mirror.get("line_items", 1)["attributes"]["name"] == "Line Item 1"
+
+
+@pytest.mark.asyncio
+async def test_mirror_load(tmp_path, httpx_mock: HTTPXMock):
+    """Test that a service is loaded with its included resources"""
+    httpx_mock.add_response(
+        json={
+            "data": [line_item(1, 10, "delivering")],
+            "included": [
+                {"type": "campaigns", "id": "10", "attributes": {"name": "Campaign"}}
+            ],
+            "meta": {},
+        }
+    )
+    mirror = Mirror(str(tmp_path / "mirror.db"))
+    pio = PlacementsIO(environment="staging", token="foo")
+    assert await mirror.load(pio.line_items, include=["campaign"]) == 1
+    assert mirror.get("campaigns", 10)["attributes"]["name"] == "Campaign"
+    line = mirror.get("line_items", 1)
+    assert line["relationships"]["campaign"]["data"] == {
+        "type": "campaigns",
+        "id": "10",
+    }
+
+
+@pytest.mark.asyncio
+async def test_mirror_load_api_types(tmp_path, httpx_mock: HTTPXMock):
+    """Test that resources stored under their API type are queried by service"""
+    with open("test/data/get/line_items.json", encoding="utf-8") as response:
+        httpx_mock.add_response(json=json.load(response))
+    mirror = Mirror(str(tmp_path / "mirror.db"))
+    pio = PlacementsIO(environment="staging", token="foo")
+    assert await mirror.load(pio.line_items) == 1
+    mirror.index("line_items", "name")
+    response = mirror.query("line_items", attributes={"name": "Line item 1"})
+    assert [item["id"] for item in response] == ["106"]
+    assert response[0]["type"] == "line-items"
+    assert mirror.get("line_items", 106)["attributes"]["name"] == "Line item 1"
+
+
+@pytest.mark.httpx_mock(can_send_already_matched_responses=True)
+@pytest.mark.asyncio
+async def test_mirror_called_from_thread(tmp_path, httpx_mock: HTTPXMock):
+    """Test that loads and syncs do not write to the mirror on the event loop"""
+    httpx_mock.add_response(json={"data": [line_item(1, 10, "delivering")], "meta": {}})
+    mirror = Mirror(str(tmp_path / "mirror.db"))
+    pio = PlacementsIO(environment="staging", token="foo")
+    sync = Sync(pio, mirror, str(tmp_path / "checkpoint.json"))
+    with patch.object(Mirror, "_merge_resource", autospec=True) as merge:
+        merge.side_effect = lambda *_: threads.append(threading.get_ident())
+        threads = []
+        await mirror.load(pio.line_items)
+        await sync.run(["line_items"])
+    assert len(threads) == 2 and threading.get_ident() not in threads
@@ -0,0 +1,40 @@
+"""
+Tests for the page size utility
+"""
+
+from pio.utility.page_size import PageSizeTuner
+
+
+def test_page_size_grows_for_fast_full_pages():
+    """Test that fast, small, full pages double the page size up to the maximum"""
+    tuner = PageSizeTuner(initial=100, max_size=300)
+    tuner.observe("line_items", 100, 100, 0.1, 1000)
+    assert tuner.size("line_items") == 200
+    tuner.observe("line_items", 200, 200, 0.1, 2000)
+    assert tuner.size("line_items") == 300
+    assert tuner.size("accounts") == 100
+
+
+def test_page_size_unchanged_for_partial_pages():
+    """Test that pages which are not full do not grow the page size"""
+    tuner = PageSizeTuner(initial=100)
+    tuner.observe("line_items", 100, 40, 0.1, 1000)
+    assert tuner.size("line_items") == 100
+
+
+def test_page_size_shrinks_for_slow_or_large_pages():
+    """Test that slow or large pages halve the page size down to the minimum"""
+    tuner = PageSizeTuner(initial=100, min_size=30, target_bytes=10000)
+    tuner.observe("line_items", 100, 100, 5.0, 1000)
+    assert tuner.size("line_items") == 50
+    tuner.observe("line_items", 50, 50, 0.1, 20000)
+    assert tuner.size("line_items") == 30
+
+
+def test_page_size_ignores_other_sizes():
+    """Test that pages requested at another size do not adjust the page size"""
+    tuner = PageSizeTuner(initial=100)
+    tuner.observe("line_items", 1, 1, 0.1, 100)
+    tuner.observe("line_items", 100, 100, 0.1, 1000)
+    tuner.observe("line_items", 100, 100, 0.1, 1000)
+    assert tuner.size("line_items") == 200
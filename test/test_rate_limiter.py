@@ -0,0 +1,73 @@
+"""
+Tests for the adaptive rate limiter utility
+"""
+
+import asyncio
+import time
+import pytest
+from pio.utility.rate_limiter import RateLimiter
+
+
+@pytest.mark.asyncio
+async def test_in_flight_limit():
+    """Test that no more than the in flight limit are admitted"""
+    limiter = RateLimiter(max_in_flight=2)
+    peak = 0
+
+    async def request():
+        nonlocal peak
+        await limiter.acquire()
+        try:
+            peak = max(peak, limiter.in_flight)
+            await asyncio.sleep(0.001)
+        finally:
+            limiter.release()
+
+    await asyncio.gather(*[request() for _ in range(10)])
+    assert peak == 2
+    assert limiter.in_flight == 0
+
+
+def test_throttle_backs_off_once():
+    """Test that throttled responses within one pause only back off once"""
+    limiter = RateLimiter(max_in_flight=16)
+    limiter.record_throttle(0.05)
+    limiter.record_throttle(0.05)
+    limiter.record_throttle(0.05)
+    assert limiter.state["in_flight_limit"] == 8
+    assert limiter.state["throttled"] == 3
+    assert 0 < limiter.backoff <= 0.05
+
+
+def test_success_ramps_up():
+    """Test that successful responses ramp the limit back up to the maximum"""
+    limiter = RateLimiter(max_in_flight=4, rate=10)
+    limiter.record_throttle(0)
+    assert limiter.state["in_flight_limit"] == 2
+    assert limiter.rate == 5
+    for _ in range(100):
+        limiter.record_success()
+    assert limiter.state["in_flight_limit"] == 4
+    assert limiter.rate == 10
+
+
+@pytest.mark.asyncio
+async def test_throttle_pauses_pool():
+    """Test that acquiring waits for the backoff period to end"""
+    limiter = RateLimiter()
+    limiter.record_throttle(0.05)
+    start = time.monotonic()
+    await limiter.acquire()
+    limiter.release()
+    assert time.monotonic() - start >= 0.04
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_rate():
+    """Test that requests are spaced out to the configured rate"""
+    limiter = RateLimiter(rate=100, burst=1)
+    start = time.monotonic()
+    for _ in range(5):
+        await limiter.acquire()
+        limiter.release()
+    assert time.monotonic() - start >= 0.03
@@ -3,11 +3,13 @@ Tests for the UPDATE method of the PlacementsIO class
 """
 
 import re
+import asyncio
 import json
 import pytest
 import httpx
 from pytest_httpx import HTTPXMock
 from pio import PlacementsIO
+from pio.error.api_error import APIError
 
 URL_REGEX = r"https://api-staging\.placements\.io/v1/(\w+)(\?.*)?"
 
@@ -92,3 +94,102 @@ async def test_get_completed_report_data(mock_get_report_csv, mock_read_complete
     # Test matching of columns/rows to dict
     for row in data:
         assert row["A"].strip("A") == row["B"].strip("B")
+
+
+@pytest.fixture()
+def mock_read_pending(httpx_mock: HTTPXMock):
+    """
+    Mocks report GET requests which are in progress for as many polls as the
+    report id before completing, or failing for report id 0
+    """
+    polls = {}
+
+    def custom_response(request):
+        report_id = int(request.url.path.split("/")[-1])
+        polls[report_id] = polls.get(report_id, 0) + 1
+        status = "completed" if polls[report_id] > report_id else "in_progress"
+        if report_id == 0:
+            status = "failed"
+        return httpx.Response(
+            status_code=200,
+            json={
+                "data": {
+                    "id": str(report_id),
+                    "type": "reports",
+                    "attributes": {"status": status, "error-message": "Failed"},
+                }
+            },
+        )
+
+    httpx_mock.add_callback(custom_response)
+    return polls
+
+
+@pytest.mark.httpx_mock(can_send_already_matched_responses=True)
+@pytest.mark.asyncio
+async def test_wait_many_reports(mock_read_pending):
+    """Tests that several reports are polled together until complete"""
+    pio = PlacementsIO(environment="staging", token="foo")
+    reports = await pio.reports.wait_many([3, 1, 2], interval=0.001)
+    assert list(reports) == [3, 1, 2]
+    assert all(_["attributes"]["status"] == "completed" for _ in reports.values())
+    assert mock_read_pending == {1: 2, 2: 3, 3: 4}
+
+
+@pytest.mark.httpx_mock(can_send_already_matched_responses=True)
+@pytest.mark.asyncio
+async def test_wait_report_does_not_block_event_loop(mock_read_pending):
+    """Tests that polling sleeps without blocking other coroutines"""
+    pio = PlacementsIO(environment="staging", token="foo")
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        for _ in range(5):
+            ticks += 1
+            await asyncio.sleep(0.001)
+
+    await asyncio.gather(pio.reports.wait(2, interval=0.01), ticker())
+    assert ticks == 5
+
+
+@pytest.mark.httpx_mock(can_send_already_matched_responses=True)
+@pytest.mark.asyncio
+async def test_wait_report_timeout(mock_read_pending):
+    """Tests that a TimeoutError is raised once the deadline has passed"""
+    pio = PlacementsIO(environment="staging", token="foo")
+    with pytest.raises(TimeoutError):
+        await pio.reports.wait(100, interval=0.01, timeout=0.03)
+
+
+@pytest.mark.asyncio
+async def test_wait_report_failed(mock_read_pending):
+    """Tests that a failed report raises an APIError"""
+    pio = PlacementsIO(environment="staging", token="foo")
+    with pytest.raises(APIError):
+        await pio.reports.wait(0)
+
+
+@pytest.mark.asyncio
+async def test_iter_report_rows_as_tuples(mock_get_report_csv, mock_read_completed):
+    """Tests that report rows stream as tuples after a shared header"""
+    pio = PlacementsIO(environment="staging", token="foo")
+    rows = [row async for row in pio.reports.iter_rows(4, as_tuples=True)]
+    headers, rows = rows[0], rows[1:]
+    assert headers[:2] == ("A", "B")
+    assert len(rows) == 5
+    assert all(isinstance(row, tuple) for row in rows)
+
+
+@pytest.mark.asyncio
+async def test_report_data_with_process_executor(
+    mock_get_report_csv, mock_read_completed
+):
+    """Tests that report rows are parsed by process workers"""
+    async with PlacementsIO(
+        environment="staging", token="foo", executor="process", workers=1
+    ) as pio:
+        data = await pio.reports.data(4)
+    assert len(data) == 5
+    for row in data:
+        assert row["A"].strip("A") == row["B"].strip("B")
@@ -0,0 +1,235 @@
+"""
+Tests for merging included resources in APIResponse
+"""
+
+import json
+from pio.model.response import APIResponse
+
+
+def identifier(resource_type, resource_id):
+    """Returns a JSON:API resource identifier relationship"""
+    return {"data": {"type": resource_type, "id": resource_id}}
+
+
+def chain(length):
+    """Returns included line items where each references the next one"""
+    return [
+        {
+            "type": "line_items",
+            "id": str(index),
+            "attributes": {"name": f"Line Item {index}"},
+            "relationships": {"next": identifier("line_items", str(index + 1))},
+        }
+        for index in range(length)
+    ]
+
+
+def test_cyclic_relationships():
+    """Test that mutual references resolve without recursing forever"""
+    data = [
+        {
+            "type": "campaigns",
+            "id": "1",
+            "relationships": {"opportunity": identifier("opportunities", "2")},
+        }
+    ]
+    included = [
+        {
+            "type": "opportunities",
+            "id": "2",
+            "relationships": {"campaign": identifier("campaigns", "3")},
+        },
+        {
+            "type": "campaigns",
+            "id": "3",
+            "relationships": {"opportunity": identifier("opportunities", "2")},
+        },
+    ]
+    response = APIResponse(data=data, included=included)
+    opportunity = response[0]["relationships"]["opportunity"]["data"]
+    campaign = opportunity["relationships"]["campaign"]["data"]
+    assert campaign["id"] == "3"
+    assert campaign["relationships"]["opportunity"]["data"] == {
+        "type": "opportunities",
+        "id": "2",
+    }
+    # Result must not contain circular references
+    assert json.dumps(list(response))
+
+
+def test_included_resolved_once_and_shared():
+    """Test that every reference to an included resource shares one object"""
+    data = [
+        {
+            "type": "line_items",
+            "id": str(index),
+            "relationships": {"campaign": identifier("campaigns", "1")},
+        }
+        for index in range(3)
+    ]
+    included = [{"type": "campaigns", "id": "1", "attributes": {"name": "C"}}]
+    response = APIResponse(data=data, included=included)
+    campaigns = [_["relationships"]["campaign"]["data"] for _ in response]
+    assert campaigns[0]["attributes"]["name"] == "C"
+    assert campaigns[0] is campaigns[1] is campaigns[2]
+
+
+def test_included_not_modified():
+    """Test that the raw included array keeps its resource identifiers"""
+    included = chain(3)
+    data = [
+        {
+            "type": "line_items",
+            "id": "x",
+            "relationships": {"next": identifier("line_items", "0")},
+        }
+    ]
+    response = APIResponse(data=data, included=included)
+    assert response.included[0]["relationships"]["next"]["data"] == {
+        "type": "line_items",
+        "id": "1",
+    }
+
+
+def test_max_depth():
+    """Test that nested relationships are only merged to the maximum depth"""
+    data = [
+        {
+            "type": "line_items",
+            "id": "x",
+            "relationships": {"next": identifier("line_items", "0")},
+        }
+    ]
+    response = APIResponse(data=data, included=chain(5), max_depth=2)
+    first = response[0]["relationships"]["next"]["data"]
+    second = first["relationships"]["next"]["data"]
+    assert second["attributes"]["name"] == "Line Item 1"
+    assert "attributes" not in second["relationships"]["next"]["data"]
+
+
+def test_deep_include_chain():
+    """Test that deep include chains are not limited by the recursion limit"""
+    data = [
+        {
+            "type": "line_items",
+            "id": "x",
+            "relationships": {"next": identifier("line_items", "0")},
+        }
+    ]
+    response = APIResponse(data=data, included=chain(5000))
+    resource = response[0]
+    for _ in range(5001):
+        resource = resource["relationships"]["next"]["data"]
+    assert resource == {"type": "line_items", "id": "5000"}
+
+
+def test_lazy_relationships_resolve_on_access():
+    """Test that lazy relationships are only resolved when read"""
+    data = [
+        {
+            "type": "line_items",
+            "id": str(index),
+            "relationships": {"campaign": identifier("campaigns", "1")},
+        }
+        for index in range(2)
+    ]
+    included = [
+        {
+            "type": "campaigns",
+            "id": "1",
+            "attributes": {"name": "C"},
+            "relationships": {"advertiser": identifier("accounts", "2")},
+        },
+        {"type": "accounts", "id": "2", "attributes": {"name": "A"}},
+    ]
+    response = APIResponse(data=data, included=included, lazy=True)
+    relationship = response[0]["relationships"]["campaign"]
+    assert dict.get(relationship, "data") == {"type": "campaigns", "id": "1"}
+
+    campaign = relationship["data"]
+    assert campaign["attributes"]["name"] == "C"
+    assert campaign["relationships"]["advertiser"]["data"]["attributes"] == {
+        "name": "A"
+    }
+    assert response[1]["relationships"]["campaign"]["data"] is campaign
+    assert included[0]["relationships"]["advertiser"]["data"] == {
+        "type": "accounts",
+        "id": "2",
+    }
+
+
+def test_lazy_matches_eager():
+    """Test that lazy responses copy and serialize in the same way as eager"""
+    data = [
+        {
+            "type": "line_items",
+            "id": "x",
+            "relationships": {"next": identifier("line_items", "0")},
+        }
+    ]
+    eager = APIResponse(data=json.loads(json.dumps(data)), included=chain(3))
+    lazy = APIResponse(data=json.loads(json.dumps(data)), included=chain(3), lazy=True)
+    assert json.dumps(list(lazy)) == json.dumps(list(eager))
+    assert dict(lazy[0]["relationships"]["next"]) == eager[0]["relationships"]["next"]
+    assert lazy == eager
+
+
+def test_lazy_cyclic_relationships():
+    """Test that lazy mutual references serialize without circular references"""
+    data = [
+        {
+            "type": "campaigns",
+            "id": "1",
+            "relationships": {"opportunity": identifier("opportunities", "2")},
+        }
+    ]
+    included = [
+        {
+            "type": "opportunities",
+            "id": "2",
+            "relationships": {"campaign": identifier("campaigns", "1")},
+        },
+        {
+            "type": "campaigns",
+            "id": "1",
+            "relationships": {
+                "opportunity": identifier("opportunities", "2"),
+                "self": identifier("campaigns", "1"),
+            },
+        },
+    ]
+    eager = APIResponse(data=json.loads(json.dumps(data)), included=included)
+    lazy = APIResponse(data=json.loads(json.dumps(data)), included=included, lazy=True)
+    opportunity = lazy[0]["relationships"]["opportunity"]["data"]
+    campaign = opportunity["relationships"]["campaign"]["data"]
+    assert campaign["relationships"]["opportunity"]["data"] == {
+        "type": "opportunities",
+        "id": "2",
+    }
+    assert campaign["relationships"]["self"]["data"] == {
+        "type": "campaigns",
+        "id": "1",
+    }
+    assert json.dumps(lazy) == json.dumps(eager)
+
+
+def test_lazy_to_many_relationships():
+    """Test that to-many relationships resolve each included resource"""
+    data = [
+        {
+            "type": "campaigns",
+            "id": "1",
+            "relationships": {
+                "line-items": {
+                    "data": [
+                        {"type": "line_items", "id": "0"},
+                        {"type": "line_items", "id": "missing"},
+                    ]
+                }
+            },
+        }
+    ]
+    response = APIResponse(data=data, included=chain(1), lazy=True)
+    line_items = response[0]["relationships"]["line-items"]["data"]
+    assert line_items[0]["attributes"]["name"] == "Line Item 0"
+    assert line_items[1] == {"type": "line_items", "id": "missing"}
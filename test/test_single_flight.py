@@ -0,0 +1,74 @@
+"""
+Tests for the single flight utility
+"""
+
+import asyncio
+import pytest
+import httpx
+from pytest_httpx import HTTPXMock
+from pio import PlacementsIO
+from pio.utility.single_flight import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_single_flight_shares_in_flight_requests():
+    """Test that identical requests in flight share one result"""
+    single_flight = SingleFlight()
+    calls = []
+
+    async def request():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"id": "1"}
+
+    results = await asyncio.gather(
+        *(single_flight.run("a", request) for _ in range(5)),
+        single_flight.run("b", request),
+    )
+    assert len(calls) == 2
+    assert results[0] is results[4]
+    assert single_flight.stats == {"requests": 2, "coalesced": 4, "in_flight": 0}
+
+    await single_flight.run("a", request)
+    assert len(calls) == 3
+
+
+@pytest.mark.asyncio
+async def test_single_flight_shares_errors_and_survives_cancellation():
+    """Test that errors are shared and a cancelled caller does not cancel others"""
+    single_flight = SingleFlight()
+
+    async def request():
+        await asyncio.sleep(0.01)
+        raise ValueError("failed")
+
+    first = asyncio.ensure_future(single_flight.run("a", request))
+    second = asyncio.ensure_future(single_flight.run("a", request))
+    await asyncio.sleep(0)
+    first.cancel()
+    with pytest.raises(ValueError):
+        await second
+    assert first.cancelled()
+
+
+@pytest.mark.asyncio
+@pytest.mark.httpx_mock(can_send_already_matched_responses=True)
+async def test_get_coalesces_identical_requests(httpx_mock: HTTPXMock):
+    """Test that identical concurrent GET requests send a single request"""
+
+    async def custom_response(request):
+        await asyncio.sleep(0.01)
+        return httpx.Response(
+            status_code=200,
+            json={"data": [{"type": "opportunities", "id": "1"}], "meta": {}},
+        )
+
+    httpx_mock.add_callback(custom_response)
+    pio = PlacementsIO(environment="staging", token="foo")
+    results = await asyncio.gather(
+        *(pio.opportunities.get(id=1) for _ in range(10)), pio.opportunities.get(id=2)
+    )
+    assert len(httpx_mock.get_requests()) == 2
+    assert all(result == results[0] for result in results)
+    assert results[0][0] is not results[1][0]
+    assert pio.single_flight.stats["coalesced"] == 9
@@ -0,0 +1,198 @@
+"""
+Tests for the SQLite cache utility
+"""
+
+import sqlite3
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from unittest.mock import patch
+import pytest
+import httpx
+from pytest_httpx import HTTPXMock
+from pio import PlacementsIO
+from pio.utility.sqlite_cache import SQLiteCache
+
+
+def write_entry(path: str, key: str, content: bytes):
+    """Stores an entry from another process"""
+    SQLiteCache(path).set(key, "products", content)
+
+
+def test_sqlite_cache_persists(tmp_path):
+    """Test that entries are stored compressed and survive reopening the cache"""
+    path = str(tmp_path / "cache.db")
+    cache = SQLiteCache(path)
+    cache.set("products", "products", b"x" * 1000)
+    cache.close()
+    stored = cache.connection.execute("SELECT content FROM responses").fetchone()[0]
+    assert len(stored) < 1000
+    cache = SQLiteCache(path)
+    assert cache.get("products") == b"x" * 1000
+    assert cache.stats["hits"] == 1
+
+
+def test_sqlite_cache_ttl_and_stale(tmp_path):
+    """Test that entries expire and are served as stale within max_stale"""
+    cache = SQLiteCache(str(tmp_path / "cache.db"), ttl=10, max_stale=20)
+    with patch("pio.utility.sqlite_cache.time.time", return_value=1000):
+        cache.set("products", "products", b"p")
+    with patch("pio.utility.sqlite_cache.time.time", return_value=1015):
+        assert cache.get("products") is None
+        assert cache.get_stale("products") == b"p"
+    with patch("pio.utility.sqlite_cache.time.time", return_value=1030):
+        cache.set("rate_cards", "rate_cards", b"r")
+        assert cache.stats["size"] == 1
+
+
+def test_sqlite_cache_lru_eviction(tmp_path):
+    """Test that the entries least recently stored or revalidated are evicted"""
+    cache = SQLiteCache(str(tmp_path / "cache.db"), max_size=2)
+    now = time.time()
+    times = [now + _ for _ in range(10)]
+    with patch("pio.utility.sqlite_cache.time.time", side_effect=times):
+        cache.set("a", "products", b"a")
+        cache.set("b", "products", b"b")
+        cache.revalidate("a")
+        cache.set("c", "products", b"c")
+    assert cache.get("b") is None
+    assert cache.get("a") == b"a"
+    assert cache.evictions == 1
+
+
+def test_sqlite_cache_reads_while_locked(tmp_path):
+    """Test that reads do not wait for another process holding the write lock"""
+    path = str(tmp_path / "cache.db")
+    cache = SQLiteCache(path)
+    cache.set("products", "products", b"p")
+    writer = sqlite3.connect(path, isolation_level=None)
+    writer.execute("BEGIN IMMEDIATE")
+    started = time.monotonic()
+    with patch("pio.utility.sqlite_cache.SQLITE_TIMEOUT", 5):
+        assert cache.get("products") == b"p"
+    assert time.monotonic() - started < 1
+    writer.rollback()
+    writer.close()
+
+
+def test_sqlite_cache_invalidate(tmp_path):
+    """Test that invalidation removes the service and entries with includes"""
+    cache = SQLiteCache(str(tmp_path / "cache.db"))
+    cache.set("products", "products", b"p")
+    cache.set("rate_cards", "rate_cards", b"r")
+    cache.set("product_rates", "product_rates", b"pr", includes=True)
+    cache.invalidate("products")
+    assert cache.stats["size"] == 1
+    cache.invalidate()
+    assert cache.stats["size"] == 0
+
+
+def test_sqlite_cache_shared_between_processes(tmp_path):
+    """Test that entries written by other processes are read"""
+    path = str(tmp_path / "cache.db")
+    cache = SQLiteCache(path)
+    assert cache.get("products") is None
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        list(
+            executor.map(
+                write_entry, [path] * 4, ["products", "a", "b", "c"], [b"p"] * 4
+            )
+        )
+    assert cache.get("products") == b"p"
+    assert cache.stats["size"] == 4
+
+
+@pytest.mark.asyncio
+async def test_get_served_from_sqlite_cache_after_restart(
+    tmp_path, httpx_mock: HTTPXMock
+):
+    """Test that a new instance is served from the persistent cache"""
+    httpx_mock.add_response(json={"data": [{"type": "products", "id": "1"}]})
+    path = str(tmp_path / "cache.db")
+    async with PlacementsIO(
+        environment="staging", token="foo", cache=SQLiteCache(path)
+    ) as pio:
+        await pio.products.get()
+    async with PlacementsIO(
+        environment="staging", token="foo", cache=SQLiteCache(path)
+    ) as pio:
+        products = await pio.products.get()
+    assert products[0]["id"] == "1"
+    assert len(httpx_mock.get_requests()) == 1
+
+
+@pytest.mark.asyncio
+async def test_sqlite_cache_separates_environments_and_tokens(
+    tmp_path, httpx_mock: HTTPXMock
+):
+    """Test that instances sharing a cache never see each other's entries"""
+    for product_id in ["1", "2", "3"]:
+        httpx_mock.add_response(json={"data": [{"type": "products", "id": product_id}]})
+    path = str(tmp_path / "cache.db")
+    results = []
+    for environment, token in [
+        ("staging", "tenantA"),
+        ("production", "tenantB"),
+        ("staging", "tenantB"),
+    ]:
+        async with PlacementsIO(
+            environment=environment, token=token, cache=SQLiteCache(path)
+        ) as pio:
+            results.append((await pio.products.get())[0]["id"])
+    assert results == ["1", "2", "3"]
+    assert len(httpx_mock.get_requests()) == 3
+    assert SQLiteCache(path).stats["size"] == 3
+
+
+@pytest.mark.asyncio
+async def test_stale_served_on_server_error(tmp_path, httpx_mock: HTTPXMock):
+    """Test that stale entries are served when refreshing fails"""
+    httpx_mock.add_response(json={"data": [{"type": "products", "id": "1"}]})
+    httpx_mock.add_response(status_code=503, json={})
+    httpx_mock.add_exception(httpx.ConnectError("Unavailable"))
+    cache = SQLiteCache(str(tmp_path / "cache.db"), ttl=10, max_stale=3600)
+    pio = PlacementsIO(environment="staging", token="foo", cache=cache)
+    await pio.products.get()
+    with patch("pio.utility.sqlite_cache.time.time", return_value=time.time() + 100):
+        assert (await pio.products.get())[0]["id"] == "1"
+        assert (await pio.products.get())[0]["id"] == "1"
+    assert cache.stale == 2
+
+
+def test_sqlite_cache_keeps_validators(tmp_path):
+    """Test that expired entries with validators are kept for revalidation"""
+    path = str(tmp_path / "cache.db")
+    cache = SQLiteCache(path, ttl=10)
+    with patch("pio.utility.sqlite_cache.time.time", return_value=1000):
+        cache.set("products", "products", b"p", validators={"etag": '"v1"'})
+        cache.set("rate_cards", "rate_cards", b"r")
+    with patch("pio.utility.sqlite_cache.time.time", return_value=2000):
+        cache.set("users", "users", b"u")
+    cache = SQLiteCache(path, ttl=10)
+    assert cache.conditional_headers("products") == {"If-None-Match": '"v1"'}
+    assert cache.conditional_headers("rate_cards") == {}
+
+
+def test_sqlite_cache_recreates_old_schema(tmp_path):
+    """Test that databases with another schema version are recreated"""
+    path = str(tmp_path / "cache.db")
+    connection = sqlite3.connect(path)
+    connection.execute("CREATE TABLE responses (key TEXT PRIMARY KEY)")
+    connection.commit()
+    connection.close()
+    cache = SQLiteCache(path)
+    cache.set("products", "products", b"p")
+    assert cache.get("products") == b"p"
+
+
+@pytest.mark.asyncio
+async def test_sqlite_cache_called_from_thread(tmp_path, httpx_mock: HTTPXMock):
+    """Test that the SQLite cache is not called on the event loop thread"""
+    httpx_mock.add_response(json={"data": [{"type": "products", "id": "1"}]})
+    cache = SQLiteCache(str(tmp_path / "cache.db"))
+    pio = PlacementsIO(environment="staging", token="foo", cache=cache)
+    with patch.object(SQLiteCache, "_write", autospec=True) as write:
+        write.side_effect = lambda *_: threads.append(threading.get_ident())
+        threads = []
+        await pio.products.get()
+    assert threads and threading.get_ident() not in threads
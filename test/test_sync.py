@@ -0,0 +1,101 @@
+"""
+Tests for the incremental sync of services
+"""
+
+import datetime
+import json
+import os
+import threading
+from unittest.mock import patch
+import pytest
+import httpx
+from pytest_httpx import HTTPXMock
+from pio import PlacementsIO
+from pio.error.api_error import APIError
+from pio.sync import JSONStore, Sync, SyncCheckpoint, atomic_write
+
+
+@pytest.fixture()
+def mock_get_modified(httpx_mock: HTTPXMock):
+    """
+    Mocks GET requests returning every account, or one modified account when
+    filtered by modified_since, and failing for campaigns
+    """
+    captured_requests = []
+
+    def custom_response(request):
+        captured_requests.append(request)
+        if "campaigns" in request.url.path:
+            return httpx.Response(status_code=400, json={"errors": [{"title": "Bad"}]})
+        if "filter[modified_since]" in request.url.params:
+            data = [{"type": "accounts", "id": "2", "attributes": {"name": "B2"}}]
+        else:
+            data = [
+                {"type": "accounts", "id": "1", "attributes": {"name": "A"}},
+                {"type": "accounts", "id": "2", "attributes": {"name": "B"}},
+            ]
+        return httpx.Response(status_code=200, json={"data": data, "meta": {}})
+
+    httpx_mock.add_callback(custom_response)
+    return captured_requests
+
+
+@pytest.mark.httpx_mock(can_send_already_matched_responses=True)
+@pytest.mark.asyncio
+async def test_sync_fetches_changes_since_checkpoint(tmp_path, mock_get_modified):
+    """Test that later syncs only fetch and merge modified resources"""
+    store_path = str(tmp_path / "store.json")
+    checkpoint_path = str(tmp_path / "checkpoint.json")
+    pio = PlacementsIO(environment="staging", token="foo")
+    sync = Sync(pio, JSONStore(store_path), checkpoint_path, overlap=60)
+    assert await sync.run(["accounts"]) == {"accounts": 2}
+    assert "filter[modified_since]" not in mock_get_modified[0].url.params
+    checkpoint = SyncCheckpoint(checkpoint_path).get("accounts")
+
+    sync = Sync(pio, JSONStore(store_path), checkpoint_path, overlap=60)
+    assert await sync.run(["accounts"]) == {"accounts": 1}
+    modified_since = mock_get_modified[1].url.params["filter[modified_since]"]
+    assert modified_since == str(checkpoint - datetime.timedelta(seconds=60))
+    assert SyncCheckpoint(checkpoint_path).get("accounts") > checkpoint
+
+    names = [
+        _["attributes"]["name"] for _ in JSONStore(store_path).resources("accounts")
+    ]
+    assert names == ["A", "B2"]
+
+
+@pytest.mark.httpx_mock(can_send_already_matched_responses=True)
+@pytest.mark.asyncio
+async def test_sync_failed_service_keeps_checkpoint(tmp_path, mock_get_modified):
+    """Test that a failed service does not advance its checkpoint"""
+    checkpoint_path = str(tmp_path / "checkpoint.json")
+    pio = PlacementsIO(environment="staging", token="foo")
+    sync = Sync(pio, JSONStore(str(tmp_path / "store.json")), checkpoint_path)
+    with pytest.raises(APIError):
+        await sync.run(["accounts", "campaigns"])
+    checkpoint = SyncCheckpoint(checkpoint_path)
+    assert checkpoint.get("accounts") is not None
+    assert checkpoint.get("campaigns") is None
+
+
+@pytest.mark.httpx_mock(can_send_already_matched_responses=True)
+@pytest.mark.asyncio
+async def test_sync_saves_from_thread(tmp_path, mock_get_modified):
+    """Test that the store and checkpoints are not saved on the event loop"""
+    pio = PlacementsIO(environment="staging", token="foo")
+    sync = Sync(pio, JSONStore(str(tmp_path / "store.json")), str(tmp_path / "c"))
+    with patch("pio.sync.atomic_write") as write:
+        write.side_effect = lambda *_: threads.append(threading.get_ident())
+        threads = []
+        await sync.run(["accounts"])
+    assert len(threads) == 2 and threading.get_ident() not in threads
+
+
+def test_atomic_write(tmp_path):
+    """Test that files are replaced without leaving temporary files"""
+    path = str(tmp_path / "checkpoint.json")
+    atomic_write(path, b"{}")
+    atomic_write(path, b'{"accounts": 1}')
+    assert os.listdir(tmp_path) == ["checkpoint.json"]
+    with open(path, encoding="utf-8") as file:
+        assert json.load(file) == {"accounts": 1}
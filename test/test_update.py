@@ -3,12 +3,14 @@ Tests for the UPDATE method of the PlacementsIO class
 """
 
 import re
+import asyncio
 import json
 from unittest.mock import patch
 import pytest
 import httpx
 from pytest_httpx import HTTPXMock
 from pio import PlacementsIO
+from pio.utility.json_codec import JSONCodec
 from pio.model.service import services
 
 API_SERVICES = [_ for _ in services if _ != "reports"]
@@ -169,3 +171,91 @@ async def test_update_with_dynamic_attributes_relationships(mock_request):
         json.loads(mock_request.call_args.kwargs["data"])["data"]["relationships"]
         == expected_relationships
     )
+
+
+@pytest.fixture()
+def mock_update_in_flight(httpx_mock: HTTPXMock):
+    """
+    Mocks a successful UPDATE request and records the peak number in flight
+    """
+    state = {"in_flight": 0, "peak": 0}
+
+    async def custom_response(request):
+        state["in_flight"] += 1
+        state["peak"] = max(state["peak"], state["in_flight"])
+        await asyncio.sleep(0.001)
+        state["in_flight"] -= 1
+        resource = json.loads(request.content)["data"]
+        return httpx.Response(status_code=200, json={"data": resource})
+
+    httpx_mock.add_callback(custom_response)
+    return state
+
+
+@pytest.mark.httpx_mock(can_send_already_matched_responses=True)
+@pytest.mark.asyncio
+async def test_update_sliding_window(mock_update_in_flight):
+    """Tests that updates keep a bounded window in flight across all ids"""
+    pio = PlacementsIO(environment="staging", token="foo")
+    resource_ids = list(range(1, 251))
+    api_response = await pio.accounts.update(
+        resource_ids=resource_ids, attributes={"foo": "bar"}, max_concurrency=5
+    )
+    assert [resource["id"] for resource in api_response] == resource_ids
+    assert mock_update_in_flight["peak"] == 5
+
+
+@pytest.mark.httpx_mock(can_send_already_matched_responses=True)
+@pytest.mark.asyncio
+async def test_update_callbacks_run_concurrently(mock_update_in_flight):
+    """Tests that callbacks run concurrently and requests start before all finish"""
+    pio = PlacementsIO(environment="staging", token="foo")
+    state = {"in_flight": 0, "peak": 0, "sent_before_last_callback": False}
+
+    async def attributes(resource_id):
+        state["in_flight"] += 1
+        state["peak"] = max(state["peak"], state["in_flight"])
+        await asyncio.sleep(0.001 * resource_id)
+        state["in_flight"] -= 1
+        if resource_id == 20 and mock_update_in_flight["peak"]:
+            state["sent_before_last_callback"] = True
+        return {"foo": resource_id}
+
+    api_response = await pio.accounts.update(
+        resource_ids=list(range(1, 21)),
+        attributes=attributes,
+        max_concurrency=2,
+        callback_concurrency=4,
+    )
+    assert [resource["attributes"]["foo"] for resource in api_response] == list(
+        range(1, 21)
+    )
+    assert state["peak"] == 4
+    assert state["sent_before_last_callback"]
+    assert mock_update_in_flight["peak"] <= 2
+
+
+@pytest.mark.httpx_mock(can_send_already_matched_responses=True)
+@pytest.mark.asyncio
+async def test_update_decodes_each_response_once(mock_update_in_flight):
+    """Tests that each update response body is decoded exactly once"""
+    codec = JSONCodec()
+    with patch.object(codec, "loads", wraps=codec.loads) as loads:
+        pio = PlacementsIO(environment="staging", token="foo", codec=codec)
+        await pio.accounts.update(resource_ids=[1, 2, 3], attributes={"foo": "bar"})
+    assert loads.call_count == 3
+    assert all(isinstance(call.args[0], bytes) for call in loads.call_args_list)
+
+
+@pytest.mark.asyncio
+async def test_update_undecodable_error(httpx_mock: HTTPXMock):
+    """Test that an HTML error is returned as an error for the resource"""
+    httpx_mock.add_response(
+        status_code=504,
+        content=b"<html>Gateway Timeout</html>",
+        headers={"Content-Type": "text/html"},
+    )
+    pio = PlacementsIO(environment="staging", token="foo")
+    api_response = await pio.campaigns.update([1], attributes={"name": "foo"})
+    assert api_response[0]["errors"][0]["title"] == "504 Gateway Timeout"
+    assert "links" in api_response[0]
@@ -0,0 +1,61 @@
+"""
+Tests for the worker pool utility
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from pio.client import decode_page
+from pio.error.api_error import APIError
+from pio.utility.json_codec import JSONCodec
+from pio.utility.worker_pool import WorkerPool
+
+
+def current_thread() -> str:
+    """Returns the name of the thread the function is run in"""
+    return threading.current_thread().name
+
+
+@pytest.mark.asyncio
+async def test_worker_pool_runs_inline_without_executor():
+    """Test that work runs on the event loop thread without an executor"""
+    pool = WorkerPool()
+    assert await pool.run(current_thread) == threading.current_thread().name
+
+
+@pytest.mark.asyncio
+async def test_worker_pool_thread_executor():
+    """Test that work runs in a worker thread and results are not copied"""
+    pool = WorkerPool("thread", workers=2)
+    assert pool.executor._max_workers == 2
+    assert await pool.run(current_thread) != threading.current_thread().name
+    data = {"data": []}
+    assert await pool.run(dict.get, data, "data") is data["data"]
+    pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_worker_pool_process_executor():
+    """Test that module level functions are run by process workers"""
+    pool = WorkerPool("process", workers=1)
+    data = await pool.run(decode_page, JSONCodec(), b'{"data": [{"id": "1"}]}')
+    assert data == {"data": [{"id": "1"}]}
+    with pytest.raises(APIError):
+        await pool.run(decode_page, JSONCodec(), b'{"errors": [{"title": "Bad"}]}')
+    pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_worker_pool_does_not_shutdown_provided_executor():
+    """Test that an executor provided by the caller is left running"""
+    executor = ThreadPoolExecutor(max_workers=1)
+    pool = WorkerPool(executor)
+    pool.shutdown()
+    assert await pool.run(current_thread) != threading.current_thread().name
+    executor.shutdown()
+
+
+def test_worker_pool_invalid_executor():
+    """Test that unknown executor names are rejected"""
+    with pytest.raises(ValueError):
+        WorkerPool("fibre")